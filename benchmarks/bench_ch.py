@@ -0,0 +1,50 @@
+"""
+Benchmark de consultas con Contraction Hierarchies contra Dijkstra.
+
+Mide el tiempo de construcción del índice y la latencia por consulta de
+las búsquedas 'heap', 'bidirectional' y 'ch' sobre una grilla dirigida.
+
+Uso:
+    python benchmarks/bench_ch.py [--size 60] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import time_search
+from bench_yen import build_grid_graph
+from k_paths_algorithm import KShortestPaths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    graph = build_grid_graph(args.size, args.seed)
+    n = graph.num_nodes
+    rng = random.Random(args.seed)
+    queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(args.queries)]
+
+    ch_paths = KShortestPaths(graph, search='ch')
+    start = time.perf_counter()
+    hierarchy = ch_paths.build_contraction_hierarchy()
+    print(f"Construcción CH ({n} nodos, {len(hierarchy.shortcuts[0])} atajos): "
+          f"{time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'búsqueda':>14} {'ms/consulta':>12}")
+    for search in ('heap', 'bidirectional', 'ch'):
+        k_paths = ch_paths if search == 'ch' else KShortestPaths(graph, search=search)
+        k_paths.dijkstra(*queries[0])
+        print(f"{search:>14} {time_search(k_paths, queries):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark de Dijkstra sobre grafos dispersos aleatorios.
+
+Compara la expansión de vecinos recorriendo la fila completa de la matriz
+(comportamiento anterior de Graph.get_neighbors) contra el índice de
+aristas salientes, que cuesta O(grado de salida).
+
+Con --search se elige la cola de prioridad de KShortestPaths ('heap' o
+'bucket') para comparar ambas variantes.
+
+Uso:
+    python benchmarks/bench_dijkstra.py [--nodes 500 1000 2000] [--degree 4]
+                                        [--search auto|heap|bucket]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graph import Graph
+from k_paths_algorithm import KShortestPaths
+
+
+class RowScanGraph(Graph):
+    """Grafo que recorre la fila completa de la matriz en cada consulta."""
+
+    def get_neighbors(self, node):
+        neighbors = []
+        if 0 <= node < self.num_nodes:
+            for i in range(self.num_nodes):
+                if self.adjacency_matrix[node][i] != np.inf and i != node:
+                    neighbors.append((i, self.adjacency_matrix[node][i]))
+        return neighbors
+
+
+def build_sparse_graph(graph: Graph, degree: int, seed: int) -> Graph:
+    """
+    Llena un grafo con un ciclo hamiltoniano aleatorio más `degree`
+    aristas aleatorias por nodo.
+
+    Args:
+        graph: Grafo vacío a llenar
+        degree: Aristas aleatorias adicionales por nodo
+        seed: Semilla aleatoria
+
+    Returns:
+        El mismo grafo, ya poblado
+    """
+    rng = random.Random(seed)
+    n = graph.num_nodes
+    nodes = list(range(n))
+    rng.shuffle(nodes)
+    for i in range(n):
+        graph.add_edge(nodes[i], nodes[(i + 1) % n], rng.randint(1, 10))
+    for u in range(n):
+        for _ in range(degree):
+            graph.add_edge(u, rng.randrange(n), rng.randint(1, 10))
+    return graph
+
+
+def time_queries(graph: Graph, queries, search: str = 'auto') -> float:
+    """
+    Mide el tiempo total de ejecutar Dijkstra para cada par de la lista.
+
+    Args:
+        graph: Grafo sobre el cual consultar
+        queries: Lista de pares (origen, destino)
+        search: Estrategia de búsqueda de KShortestPaths
+
+    Returns:
+        Segundos transcurridos
+    """
+    k_paths = KShortestPaths(graph, search=search)
+    start = time.perf_counter()
+    for source, dest in queries:
+        k_paths.dijkstra(source, dest)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--search', choices=KShortestPaths.SEARCHES, default='auto')
+    args = parser.parse_args()
+
+    print(f"{'nodos':>8} {'fila (s)':>10} {'índice (s)':>11} {'speedup':>8}")
+    for n in args.nodes:
+        rng = random.Random(args.seed)
+        queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(args.queries)]
+
+        scan_graph = build_sparse_graph(RowScanGraph(n), args.degree, args.seed)
+        index_graph = build_sparse_graph(Graph(n), args.degree, args.seed)
+        scan_time = time_queries(scan_graph, queries, args.search)
+        index_time = time_queries(index_graph, queries, args.search)
+
+        print(f"{n:>8} {scan_time:>10.3f} {index_time:>11.3f} {scan_time / index_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark de consultas punto a punto con las estrategias de búsqueda de
+KShortestPaths sobre un grafo disperso grande.
+
+Uso:
+    python benchmarks/bench_search.py [--nodes 20000] [--degree 4] [--queries 50]
+                                      [--landmarks 16]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_dijkstra import build_sparse_graph
+from graph import Graph
+from k_paths_algorithm import KShortestPaths
+
+
+def time_search(k_paths: KShortestPaths, queries) -> float:
+    """
+    Mide la latencia media de dijkstra() sobre una lista de consultas.
+
+    Args:
+        k_paths: Instancia configurada con la estrategia a medir
+        queries: Lista de pares (origen, destino)
+
+    Returns:
+        Milisegundos por consulta
+    """
+    start = time.perf_counter()
+    for source, dest in queries:
+        k_paths.dijkstra(source, dest)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--landmarks', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    graph = build_sparse_graph(Graph(args.nodes, sparse=True), args.degree, args.seed)
+    rng = random.Random(args.seed)
+    queries = [(rng.randrange(args.nodes), rng.randrange(args.nodes))
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    graph.preprocess_landmarks(args.landmarks, seed=args.seed)
+    print(f"Preprocesamiento ALT ({args.landmarks} landmarks): "
+          f"{time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'búsqueda':>14} {'ms/consulta':>12}")
+    for search in ('heap', 'bucket', 'bidirectional', 'alt'):
+        k_paths = KShortestPaths(graph, search=search)
+        # Construir los índices del grafo fuera de la medición
+        k_paths.dijkstra(*queries[0])
+        print(f"{search:>14} {time_search(k_paths, queries):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
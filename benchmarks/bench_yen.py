@@ -0,0 +1,84 @@
+"""
+Benchmark de Yen clásico contra Yen con reutilización del árbol inverso.
+
+Usa grillas dirigidas (aristas en ambos sentidos entre celdas vecinas),
+donde los caminos entre esquinas opuestas son largos y cada camino
+aceptado genera muchas búsquedas de desviación.
+
+Uso:
+    python benchmarks/bench_yen.py [--sizes 10 20 30] [--k 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graph import Graph
+from k_paths_algorithm import KShortestPaths
+
+
+def build_grid_graph(size: int, seed: int) -> Graph:
+    """
+    Construye una grilla size×size con pesos aleatorios en [1, 10].
+
+    Args:
+        size: Cantidad de filas y columnas
+        seed: Semilla aleatoria
+
+    Returns:
+        Grafo disperso con size² nodos
+    """
+    rng = random.Random(seed)
+    graph = Graph(size * size, sparse=True)
+    for r in range(size):
+        for c in range(size):
+            u = r * size + c
+            if c + 1 < size:
+                graph.add_edge(u, u + 1, rng.randint(1, 10))
+                graph.add_edge(u + 1, u, rng.randint(1, 10))
+            if r + 1 < size:
+                graph.add_edge(u, u + size, rng.randint(1, 10))
+                graph.add_edge(u + size, u, rng.randint(1, 10))
+    return graph
+
+
+def time_query(graph: Graph, algorithm: str, k: int):
+    """
+    Mide una consulta de k caminos entre esquinas opuestas de la grilla.
+
+    Args:
+        graph: Grafo en forma de grilla
+        algorithm: Variante de KShortestPaths
+        k: Número de caminos
+
+    Returns:
+        Tupla (segundos, costos encontrados)
+    """
+    k_paths = KShortestPaths(graph, algorithm=algorithm)
+    start = time.perf_counter()
+    paths = k_paths.find_k_shortest_paths(0, graph.num_nodes - 1, k)
+    return time.perf_counter() - start, [cost for _, cost in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 30])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'nodos':>8} {'yen (s)':>10} {'yen_spt (s)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        graph = build_grid_graph(size, args.seed)
+        yen_time, _ = time_query(graph, 'yen', args.k)
+        spt_time, _ = time_query(graph, 'yen_spt', args.k)
+        print(f"{graph.num_nodes:>8} {yen_time:>10.3f} {spt_time:>12.3f} "
+              f"{yen_time / spt_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from graph import Graph
+
+
+class ContractionHierarchy:
+    """
+    Índice de Contraction Hierarchies para consultas punto a punto.
+
+    Los nodos se contraen en orden de importancia; al contraer un nodo v se
+    agregan atajos u -> x con costo w(u, v) + w(v, x) cuando no existe un
+    camino testigo igual o más corto que evite v. Las consultas ejecutan un
+    Dijkstra bidireccional que solo sube en el orden de contracción, por lo
+    que asientan muy pocos nodos. Los atajos guardan su nodo intermedio para
+    reconstruir el camino original.
+    """
+
+    def __init__(self, num_nodes: int, rank: np.ndarray,
+                 forward: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 backward: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 shortcuts: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 graph_fingerprint: str = ''):
+        """
+        Inicializa el índice a partir de sus arreglos.
+
+        Args:
+            num_nodes: Número de nodos
+            rank: Posición de cada nodo en el orden de contracción
+            forward: CSR (offsets, targets, weights) de aristas u -> x con
+                rank[x] > rank[u]
+            backward: CSR (offsets, targets, weights) de aristas x -> u
+                almacenadas en u, con rank[x] > rank[u]
+            shortcuts: Arreglos (origen, destino, intermedio) de los atajos
+            graph_fingerprint: Huella del grafo sobre el cual se construyó
+                (ver Graph.fingerprint)
+        """
+        self.num_nodes = num_nodes
+        self.rank = rank
+        self.forward = forward
+        self.backward = backward
+        self.shortcuts = shortcuts
+        self.graph_fingerprint = graph_fingerprint
+
+        self._forward_edges = self._csr_to_lists(forward)
+        self._backward_edges = self._csr_to_lists(backward)
+        self._middle: Dict[Tuple[int, int], int] = {
+            (u, v): m for u, v, m in zip(*(array.tolist() for array in shortcuts))
+        }
+
+    @classmethod
+    def build(cls, graph: Graph, witness_settle_limit: int = 64) -> 'ContractionHierarchy':
+        """
+        Construye el índice contrayendo los nodos del grafo.
+
+        El orden usa la diferencia de aristas (atajos agregados menos
+        aristas eliminadas) más la cantidad de vecinos ya contraídos, con
+        actualización perezosa de prioridades.
+
+        Args:
+            graph: Grafo a indexar
+            witness_settle_limit: Máximo de nodos asentados por búsqueda de
+                testigos; un límite menor construye más rápido a cambio de
+                algunos atajos innecesarios
+
+        Returns:
+            Índice construido
+        """
+        n = graph.num_nodes
+        out_edges = [dict(graph.get_neighbors(u)) for u in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, weight in out_edges[u].items():
+                in_edges[v][u] = weight
+
+        contracted = [False] * n
+        contracted_neighbors = [0] * n
+        middle: Dict[Tuple[int, int], int] = {}
+        forward_lists: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        backward_lists: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        rank = np.empty(n, dtype=np.int64)
+
+        def shortcuts_for(v: int) -> List[Tuple[int, int, float]]:
+            needed = []
+            for u, w_in in in_edges[v].items():
+                targets = {x: w_in + w_out for x, w_out in out_edges[v].items() if x != u}
+                if not targets:
+                    continue
+                witness = cls._witness_search(out_edges, u, v, max(targets.values()),
+                                              witness_settle_limit)
+                for x, cost in targets.items():
+                    if witness.get(x, np.inf) > cost:
+                        needed.append((u, x, cost))
+            return needed
+
+        def priority(v: int, needed: List[Tuple[int, int, float]]) -> int:
+            edge_difference = len(needed) - len(in_edges[v]) - len(out_edges[v])
+            return edge_difference + contracted_neighbors[v]
+
+        pq = [(priority(v, shortcuts_for(v)), v) for v in range(n)]
+        heapq.heapify(pq)
+        order = 0
+
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+
+            # Actualización perezosa: recalcular y reinsertar si ya no es mínima
+            needed = shortcuts_for(v)
+            current = priority(v, needed)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+
+            for u, x, cost in needed:
+                if out_edges[u].get(x, np.inf) > cost:
+                    out_edges[u][x] = cost
+                    in_edges[x][u] = cost
+                    middle[(u, x)] = v
+
+            # Las aristas restantes de v llevan a nodos de mayor rango
+            forward_lists[v] = list(out_edges[v].items())
+            backward_lists[v] = list(in_edges[v].items())
+
+            for x in out_edges[v]:
+                del in_edges[x][v]
+                contracted_neighbors[x] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            out_edges[v] = {}
+            in_edges[v] = {}
+
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+
+        shortcuts = (np.array([u for u, _ in middle], dtype=np.int64),
+                     np.array([x for _, x in middle], dtype=np.int64),
+                     np.array(list(middle.values()), dtype=np.int64))
+
+        return cls(n, rank, cls._lists_to_csr(forward_lists), cls._lists_to_csr(backward_lists),
+                   shortcuts, graph.fingerprint())
+
+    @staticmethod
+    def _witness_search(out_edges: List[Dict[int, float]], source: int, skip: int,
+                        max_cost: float, settle_limit: int) -> Dict[int, float]:
+        """
+        Dijkstra acotado desde source que evita el nodo skip.
+
+        Args:
+            out_edges: Aristas salientes del grafo aún no contraído
+            source: Nodo inicial
+            skip: Nodo que se está contrayendo
+            max_cost: Distancia a partir de la cual se detiene la búsqueda
+            settle_limit: Máximo de nodos asentados
+
+        Returns:
+            Distancias encontradas (cotas superiores de las reales)
+        """
+        distances = {source: 0}
+        pq = [(0, source)]
+        settled = 0
+
+        while pq and settled < settle_limit:
+            current_dist, u = heapq.heappop(pq)
+            if current_dist > distances[u]:
+                continue
+            if current_dist > max_cost:
+                break
+            settled += 1
+
+            for v, weight in out_edges[u].items():
+                if v == skip:
+                    continue
+                new_dist = current_dist + weight
+                if new_dist < distances.get(v, np.inf):
+                    distances[v] = new_dist
+                    heapq.heappush(pq, (new_dist, v))
+
+        return distances
+
+    def query(self, source: int, dest: int) -> Tuple[Optional[List[int]], float]:
+        """
+        Calcula el camino más corto con la búsqueda bidireccional ascendente.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+
+        Returns:
+            Tupla (camino, costo). Retorna (None, inf) si no hay camino.
+        """
+        if source == dest:
+            return [source], 0
+
+        # Índice 0: búsqueda hacia adelante, índice 1: hacia atrás
+        distances = ({source: 0}, {dest: 0})
+        previous = ({source: -1}, {dest: -1})
+        queues = ([(0, source)], [(0, dest)])
+        edges = (self._forward_edges, self._backward_edges)
+
+        best_cost = np.inf
+        meeting_node = -1
+
+        while queues[0] or queues[1]:
+            side = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+            current_dist, u = heapq.heappop(queues[side])
+            if current_dist >= best_cost:
+                # Todo lo que queda en esta cola es al menos igual de caro
+                queues[side].clear()
+                continue
+            if current_dist > distances[side][u]:
+                continue
+
+            other = distances[1 - side]
+            if u in other and current_dist + other[u] < best_cost:
+                best_cost = current_dist + other[u]
+                meeting_node = u
+
+            for v, weight in edges[side][u]:
+                new_dist = current_dist + weight
+                if new_dist < distances[side].get(v, np.inf):
+                    distances[side][v] = new_dist
+                    previous[side][v] = u
+                    heapq.heappush(queues[side], (new_dist, v))
+
+        if meeting_node == -1:
+            return None, np.inf
+
+        up_path = []
+        node = meeting_node
+        while node != -1:
+            up_path.append(node)
+            node = previous[0][node]
+        up_path.reverse()
+
+        node = previous[1][meeting_node]
+        while node != -1:
+            up_path.append(node)
+            node = previous[1][node]
+
+        path = [source]
+        for u, v in zip(up_path, up_path[1:]):
+            self._unpack_edge(u, v, path)
+        return path, best_cost
+
+    def _unpack_edge(self, u: int, v: int, path: List[int]) -> None:
+        """
+        Agrega a path los nodos de la arista u -> v (sin u), expandiendo
+        recursivamente los atajos.
+
+        Args:
+            u: Nodo origen de la arista
+            v: Nodo destino de la arista
+            path: Camino en construcción, que termina en u
+        """
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            mid = self._middle.get((a, b))
+            if mid is None:
+                path.append(b)
+            else:
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+    def save(self, filename: str) -> None:
+        """
+        Guarda el índice en un archivo .npz.
+
+        Args:
+            filename: Ruta del archivo
+        """
+        np.savez(filename,
+                 meta=np.array([self.num_nodes], dtype=np.int64),
+                 fingerprint=np.array(self.graph_fingerprint),
+                 rank=self.rank,
+                 forward_offsets=self.forward[0], forward_targets=self.forward[1],
+                 forward_weights=self.forward[2],
+                 backward_offsets=self.backward[0], backward_targets=self.backward[1],
+                 backward_weights=self.backward[2],
+                 shortcut_sources=self.shortcuts[0], shortcut_targets=self.shortcuts[1],
+                 shortcut_middle=self.shortcuts[2])
+
+    @classmethod
+    def load(cls, filename: str) -> 'ContractionHierarchy':
+        """
+        Carga un índice guardado con save().
+
+        Args:
+            filename: Ruta del archivo
+
+        Returns:
+            Índice cargado
+        """
+        with np.load(filename) as data:
+            num_nodes = int(data['meta'][0])
+            # Los índices sin huella nunca coinciden y se reconstruyen
+            graph_fingerprint = str(data['fingerprint']) if 'fingerprint' in data.files else ''
+            return cls(num_nodes, data['rank'],
+                       (data['forward_offsets'], data['forward_targets'],
+                        data['forward_weights']),
+                       (data['backward_offsets'], data['backward_targets'],
+                        data['backward_weights']),
+                       (data['shortcut_sources'], data['shortcut_targets'],
+                        data['shortcut_middle']),
+                       graph_fingerprint)
+
+    @staticmethod
+    def _lists_to_csr(lists: List[List[Tuple[int, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convierte listas de adyacencia en arreglos CSR.
+
+        Args:
+            lists: Lista por nodo de tuplas (vecino, peso)
+
+        Returns:
+            Tupla (offsets, targets, weights)
+        """
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in lists], out=offsets[1:])
+        targets = np.fromiter((v for edges in lists for v, _ in edges),
+                              dtype=np.int64, count=offsets[-1])
+        weights = np.fromiter((w for edges in lists for _, w in edges),
+                              dtype=np.float64, count=offsets[-1])
+        return offsets, targets, weights
+
+    @staticmethod
+    def _csr_to_lists(csr: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> List[List[Tuple[int, float]]]:
+        """
+        Convierte arreglos CSR en listas de adyacencia para las consultas.
+
+        Args:
+            csr: Tupla (offsets, targets, weights)
+
+        Returns:
+            Lista por nodo de tuplas (vecino, peso)
+        """
+        offsets, targets, weights = (array.tolist() for array in csr)
+        return [list(zip(targets[offsets[u]:offsets[u + 1]], weights[offsets[u]:offsets[u + 1]]))
+                for u in range(len(offsets) - 1)]
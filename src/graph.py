@@ -1,4 +1,6 @@
-import random
+import hashlib
+import heapq
+import struct
 import numpy as np
 from typing import List, Tuple, Optional
 
@@ -6,21 +8,69 @@ from typing import List, Tuple, Optional
 class Graph:
     """
     Clase para representar un grafo dirigido ponderado.
-    Utiliza matriz de adyacencia para almacenar las conexiones.
+    Utiliza matriz de adyacencia para almacenar las conexiones, o bien
+    arreglos CSR (offsets/targets/weights) cuando se crea con sparse=True.
     """
 
-    def __init__(self, num_nodes: int = 0):
+    # Cambios pendientes mínimos antes de consolidar el almacenamiento CSR
+    MIN_PENDING_COMPACT = 4096
+
+    # Formato binario de save/load: firma, encabezado (formato, disperso,
+    # nodos, aristas, bytes de etiquetas) y secciones alineadas a 64 bytes
+    FILE_MAGIC = b'KGRAFOS\x00'
+    FILE_FORMAT = 1
+    _FILE_HEADER = struct.Struct('<8sIIQQQ')
+    _FILE_ALIGN = 64
+
+    def __init__(self, num_nodes: int = 0, sparse: bool = False):
         """
         Inicializa un grafo con num_nodes nodos.
 
         Args:
             num_nodes: Número de nodos del grafo
+            sparse: Si True, usa almacenamiento CSR cuya memoria crece con
+                el número de aristas en lugar de una matriz N×N
         """
         self.num_nodes = num_nodes
-        self.adjacency_matrix = np.full((num_nodes, num_nodes), np.inf)
-        np.fill_diagonal(self.adjacency_matrix, 0)
+        self.sparse = sparse
+
+        if sparse:
+            # La matriz densa no existe en el backend disperso
+            self.adjacency_matrix = None
+            self.csr_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+            self.csr_targets = np.empty(0, dtype=np.int32)
+            self.csr_weights = np.empty(0, dtype=np.float64)
+            # Cambios aún no consolidados: {origen: {destino: peso}},
+            # un peso infinito indica una arista eliminada
+            self._pending = {}
+            self._pending_count = 0
+        else:
+            self.adjacency_matrix = np.full((num_nodes, num_nodes), np.inf)
+            np.fill_diagonal(self.adjacency_matrix, 0)
+
         self.node_labels = [str(i) for i in range(num_nodes)]
 
+        # Contador de modificaciones; los índices y cachés externos lo
+        # comparan para detectar que quedaron desactualizados
+        self.version = 0
+        # Huella de las aristas (ver fingerprint), válida para una versión
+        self._fingerprint: Optional[Tuple[int, str]] = None
+
+        # Índice de aristas salientes por nodo, construido bajo demanda
+        # e invalidado por add_edge/remove_edge
+        self._out_edges: List[Optional[List[Tuple[int, float]]]] = [None] * num_nodes
+        # Índice inverso (aristas entrantes), construido en la primera
+        # consulta y mantenido por add_edge/remove_edge
+        self._in_edges: Optional[List[List[Tuple[int, float]]]] = None
+        # Cota de pesos enteros (ver max_integer_weight); False = sin calcular
+        self._integer_weight_bound = False
+
+        # Preprocesamiento ALT (ver preprocess_landmarks); se descarta al
+        # modificar el grafo porque las cotas dejarían de ser válidas
+        self.landmarks: Optional[np.ndarray] = None
+        self.landmark_from: Optional[np.ndarray] = None
+        self.landmark_to: Optional[np.ndarray] = None
+
     def add_edge(self, source: int, dest: int, weight: float) -> bool:
         """
         Agrega una arista al grafo.
@@ -35,7 +85,11 @@ class Graph:
         """
         if 0 <= source < self.num_nodes and 0 <= dest < self.num_nodes:
             if source != dest and weight > 0:
-                self.adjacency_matrix[source][dest] = weight
+                if self.sparse:
+                    self._set_pending(source, dest, weight)
+                else:
+                    self.adjacency_matrix[source][dest] = weight
+                self._edge_changed(source, dest, weight)
                 return True
         return False
 
@@ -51,10 +105,55 @@ class Graph:
             True si se eliminó exitosamente, False en caso contrario
         """
         if 0 <= source < self.num_nodes and 0 <= dest < self.num_nodes:
-            self.adjacency_matrix[source][dest] = np.inf
+            if self.sparse:
+                if source != dest:
+                    self._set_pending(source, dest, np.inf)
+            else:
+                self.adjacency_matrix[source][dest] = np.inf
+            self._edge_changed(source, dest, np.inf)
             return True
         return False
 
+    def add_edges(self, sources, dests, weights) -> int:
+        """
+        Agrega o actualiza un lote de aristas en una sola operación.
+
+        La validación es vectorial y las entradas inválidas (nodos fuera de
+        rango, lazos o pesos no positivos) se descartan igual que en
+        add_edge. Si una arista aparece varias veces se conserva el último
+        peso. La versión del grafo aumenta una sola vez.
+
+        Args:
+            sources: Arreglo de nodos origen
+            dests: Arreglo de nodos destino
+            weights: Arreglo de pesos (o un escalar para todas)
+
+        Returns:
+            Cantidad de aristas aplicadas
+        """
+        sources, dests = self._edge_arrays(sources, dests)
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), sources.shape)
+        valid = self._valid_edges(sources, dests) & (weights > 0) & (weights != np.inf)
+        return self._apply_edges(sources[valid], dests[valid], weights[valid])
+
+    def remove_edges(self, sources, dests) -> int:
+        """
+        Elimina un lote de aristas en una sola operación. Los pares fuera
+        de rango y los lazos se ignoran. La versión del grafo aumenta una
+        sola vez.
+
+        Args:
+            sources: Arreglo de nodos origen
+            dests: Arreglo de nodos destino
+
+        Returns:
+            Cantidad de pares procesados
+        """
+        sources, dests = self._edge_arrays(sources, dests)
+        valid = self._valid_edges(sources, dests)
+        return self._apply_edges(sources[valid], dests[valid],
+                                 np.full(int(valid.sum()), np.inf))
+
     def get_weight(self, source: int, dest: int) -> float:
         """
         Obtiene el peso de una arista.
@@ -67,30 +166,169 @@ class Graph:
             Peso de la arista o infinito si no existe
         """
         if 0 <= source < self.num_nodes and 0 <= dest < self.num_nodes:
+            if self.sparse:
+                if source == dest:
+                    return 0.0
+                pending = self._pending.get(source)
+                if pending is not None and dest in pending:
+                    return pending[dest]
+                return self._csr_lookup(source, dest)
             return self.adjacency_matrix[source][dest]
         return np.inf
 
     def get_neighbors(self, node: int) -> List[Tuple[int, float]]:
         """
-        Obtiene los vecinos de un nodo con sus pesos.
+        Obtiene los vecinos de un nodo con sus pesos en O(grado de salida),
+        usando el índice de aristas salientes.
 
         Args:
             node: Nodo a consultar
 
         Returns:
-            Lista de tuplas (vecino, peso)
+            Lista de tuplas (vecino, peso). La lista es compartida con el
+            índice interno y no debe modificarse.
         """
-        neighbors = []
-        if 0 <= node < self.num_nodes:
-            for i in range(self.num_nodes):
-                if self.adjacency_matrix[node][i] != np.inf and i != node:
-                    neighbors.append((i, self.adjacency_matrix[node][i]))
+        if not 0 <= node < self.num_nodes:
+            return []
+
+        neighbors = self._out_edges[node]
+        if neighbors is None:
+            if self.sparse:
+                neighbors = self._sparse_neighbors(node)
+            else:
+                row = self.adjacency_matrix[node]
+                targets = np.flatnonzero(row != np.inf)
+                targets = targets[targets != node]
+                neighbors = list(zip(targets.tolist(), row[targets].tolist()))
+            self._out_edges[node] = neighbors
         return neighbors
 
+    def get_predecessors(self, node: int) -> List[Tuple[int, float]]:
+        """
+        Obtiene los nodos con una arista hacia node, con sus pesos.
+
+        Args:
+            node: Nodo a consultar
+
+        Returns:
+            Lista de tuplas (predecesor, peso). La lista es compartida con
+            el índice interno y no debe modificarse.
+        """
+        if not 0 <= node < self.num_nodes:
+            return []
+
+        if self._in_edges is None:
+            in_edges = [[] for _ in range(self.num_nodes)]
+            for u in range(self.num_nodes):
+                for v, weight in self.get_neighbors(u):
+                    in_edges[v].append((u, weight))
+            self._in_edges = in_edges
+        return self._in_edges[node]
+
+    def shortest_distances(self, source: int, reverse: bool = False) -> np.ndarray:
+        """
+        Calcula las distancias más cortas desde un nodo a todos los demás.
+
+        Args:
+            source: Nodo de partida
+            reverse: Si True, recorre las aristas invertidas y retorna las
+                distancias de cada nodo hacia source
+
+        Returns:
+            Arreglo de N distancias (infinito si no hay camino)
+        """
+        distances = np.full(self.num_nodes, np.inf)
+        distances[source] = 0
+        pq = [(0.0, source)]
+
+        while pq:
+            current_dist, u = heapq.heappop(pq)
+            if current_dist > distances[u]:
+                continue
+
+            edges = self.get_predecessors(u) if reverse else self.get_neighbors(u)
+            for v, weight in edges:
+                new_dist = current_dist + weight
+                if new_dist < distances[v]:
+                    distances[v] = new_dist
+                    heapq.heappush(pq, (new_dist, v))
+
+        return distances
+
+    def preprocess_landmarks(self, num_landmarks: int = 8, seed: Optional[int] = None) -> None:
+        """
+        Preprocesamiento ALT (A* + landmarks): elige landmarks y guarda sus
+        tablas de distancias para obtener cotas inferiores con la
+        desigualdad triangular (ver landmark_lower_bounds).
+
+        Los landmarks se eligen por el criterio del más lejano: cada nuevo
+        landmark es el nodo más alejado (ida y vuelta) de los ya elegidos.
+        Las tablas se descartan en la siguiente modificación del grafo.
+
+        Args:
+            num_landmarks: Cantidad de landmarks
+            seed: Semilla para elegir el primer landmark
+        """
+        if self.num_nodes == 0:
+            return
+
+        num_landmarks = min(num_landmarks, self.num_nodes)
+        rng = np.random.default_rng(seed)
+
+        landmarks = []
+        landmark_from = np.empty((num_landmarks, self.num_nodes))
+        landmark_to = np.empty((num_landmarks, self.num_nodes))
+        closest = np.full(self.num_nodes, np.inf)
+        candidate = int(rng.integers(self.num_nodes))
+
+        for idx in range(num_landmarks):
+            landmarks.append(candidate)
+            landmark_from[idx] = self.shortest_distances(candidate)
+            landmark_to[idx] = self.shortest_distances(candidate, reverse=True)
+
+            # Distancia de ida y vuelta; los nodos inalcanzables se tratan
+            # como los más lejanos para cubrir otras componentes
+            round_trip = landmark_from[idx] + landmark_to[idx]
+            finite = round_trip != np.inf
+            top = round_trip[finite].max() if finite.any() else 0.0
+            round_trip[~finite] = top + 1
+            closest = np.minimum(closest, round_trip)
+            closest[landmarks] = -1
+            candidate = int(np.argmax(closest))
+
+        self.landmarks = np.array(landmarks, dtype=np.int64)
+        self.landmark_from = landmark_from
+        self.landmark_to = landmark_to
+
+    def landmark_lower_bounds(self, target: int) -> np.ndarray:
+        """
+        Calcula una cota inferior de la distancia de cada nodo a target con
+        los landmarks: d(v, t) >= d(L, t) - d(L, v) y d(v, t) >= d(v, L) - d(t, L).
+
+        Args:
+            target: Nodo destino
+
+        Returns:
+            Arreglo de N cotas (infinito si el nodo no puede alcanzar target)
+        """
+        if self.landmarks is None:
+            raise ValueError("El grafo no tiene landmarks; ejecute preprocess_landmarks")
+
+        with np.errstate(invalid='ignore'):
+            bounds = np.maximum(self.landmark_from[:, target, None] - self.landmark_from,
+                                self.landmark_to - self.landmark_to[:, target, None])
+        # inf - inf no aporta información
+        bounds[np.isnan(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0)
+
     def is_connected(self, source: int, dest: int) -> bool:
         """
         Verifica si existe al menos un camino entre dos nodos usando BFS.
 
+        Cada nivel del BFS se expande en bloque: la frontera es una máscara
+        booleana y sus vecinos se obtienen con operaciones vectoriales sobre
+        la matriz o los arreglos CSR.
+
         Args:
             source: Nodo origen
             dest: Nodo destino
@@ -101,35 +339,164 @@ class Graph:
         if source == dest:
             return True
 
-        visited = [False] * self.num_nodes
-        queue = [source]
+        visited = np.zeros(self.num_nodes, dtype=bool)
         visited[source] = True
+        frontier = np.array([source])
 
-        while queue:
-            current = queue.pop(0)
-
-            for neighbor, _ in self.get_neighbors(current):
-                if neighbor == dest:
-                    return True
-                if not visited[neighbor]:
-                    visited[neighbor] = True
-                    queue.append(neighbor)
+        while len(frontier):
+            reached = np.zeros(self.num_nodes, dtype=bool)
+            reached[self._expand_frontier(frontier)] = True
+            if reached[dest]:
+                return True
+            reached &= ~visited
+            visited |= reached
+            frontier = np.flatnonzero(reached)
 
         return False
 
+    def _expand_frontier(self, frontier: np.ndarray) -> np.ndarray:
+        """
+        Obtiene los destinos de todas las aristas salientes de un conjunto
+        de nodos.
+
+        Args:
+            frontier: Nodos a expandir
+
+        Returns:
+            Arreglo de vecinos (puede contener repetidos)
+        """
+        if not self.sparse:
+            rows = self.adjacency_matrix[frontier] != np.inf
+            return np.flatnonzero(rows.any(axis=0))
+
+        self.compact()
+        starts = self.csr_offsets[frontier]
+        counts = self.csr_offsets[frontier + 1] - starts
+        # Posiciones CSR de cada fila concatenadas sin bucle en Python
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions += np.arange(counts.sum())
+        return self.csr_targets[positions]
+
+    def strongly_connected_components(self) -> Tuple[int, np.ndarray]:
+        """
+        Calcula las componentes fuertemente conexas con el algoritmo de
+        Tarjan (versión iterativa, O(N + M)).
+
+        Las componentes se numeran en orden topológico del grafo condensado:
+        toda arista entre componentes distintas va de una etiqueta menor a
+        una mayor.
+
+        Returns:
+            Tupla (cantidad de componentes, etiqueta de cada nodo)
+        """
+        n = self.num_nodes
+        sources, targets, _ = self.get_edge_arrays()
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+        offsets = offsets.tolist()
+        targets = targets.tolist()
+
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        component = [-1] * n
+        stack = []
+        counter = 0
+        finished = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # Pila de llamadas: (nodo, próxima posición CSR a visitar)
+            work = [(root, offsets[root])]
+
+            while work:
+                u, position = work[-1]
+                if position < offsets[u + 1]:
+                    work[-1] = (u, position + 1)
+                    v = targets[position]
+                    if index[v] == -1:
+                        index[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = True
+                        work.append((v, offsets[v]))
+                    elif on_stack[v] and index[v] < low[u]:
+                        low[u] = index[v]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[u] < low[parent]:
+                        low[parent] = low[u]
+                if low[u] == index[u]:
+                    while True:
+                        v = stack.pop()
+                        on_stack[v] = False
+                        component[v] = finished
+                        if v == u:
+                            break
+                    finished += 1
+
+        # Tarjan completa primero las componentes sumidero; invertir el orden
+        labels = finished - 1 - np.array(component, dtype=np.int64)
+        return finished, labels
+
+    def reachability_matrix(self) -> np.ndarray:
+        """
+        Calcula la alcanzabilidad entre todos los pares de nodos.
+
+        Se resuelve sobre el grafo condensado de componentes fuertemente
+        conexas, recorriéndolo en orden topológico inverso y combinando las
+        filas de los sucesores con operaciones vectoriales.
+
+        Returns:
+            Matriz booleana N×N; reach[i][j] es True si j es alcanzable
+            desde i (incluido i == j)
+        """
+        num_components, labels = self.strongly_connected_components()
+        sources, targets, _ = self.get_edge_arrays()
+        c_src, c_dst = labels[sources], labels[targets]
+        between = c_src != c_dst
+        order = np.argsort(c_src[between], kind='stable')
+        c_src, c_dst = c_src[between][order], c_dst[between][order]
+        bounds = np.searchsorted(c_src, np.arange(num_components + 1))
+
+        reach = np.zeros((num_components, num_components), dtype=bool)
+        for c in range(num_components - 1, -1, -1):
+            reach[c, c] = True
+            successors = c_dst[bounds[c]:bounds[c + 1]]
+            if len(successors):
+                reach[c] |= reach[successors].any(axis=0)
+
+        return reach[np.ix_(labels, labels)]
+
     @staticmethod
     def generate_random_graph(num_nodes: int, density: float = 0.3,
                               min_weight: int = 1, max_weight: int = 10,
-                              ensure_connected: bool = True) -> 'Graph':
+                              ensure_connected: bool = True, seed: Optional[int] = None,
+                              sparse: bool = False) -> 'Graph':
         """
         Genera un grafo aleatorio no completamente conectado.
 
+        Las aristas y sus pesos se sortean en bloque con NumPy. En el
+        backend disperso se sortea la cantidad de aristas (binomial) y luego
+        sus posiciones sin reemplazo, de modo que nunca se construye la
+        matriz N×N.
+
         Args:
             num_nodes: Número de nodos
             density: Probabilidad de que exista una arista (0.0 a 1.0)
             min_weight: Peso mínimo de las aristas
             max_weight: Peso máximo de las aristas
             ensure_connected: Si True, garantiza que el grafo sea conexo
+            seed: Semilla de np.random.Generator para resultados reproducibles
+            sparse: Si True, genera el grafo con almacenamiento CSR
 
         Returns:
             Grafo aleatorio generado
@@ -140,30 +507,74 @@ class Graph:
         if not 0 <= density <= 1:
             raise ValueError("La densidad debe estar entre 0 y 1")
 
-        graph = Graph(num_nodes)
+        rng = np.random.default_rng(seed)
+        n = num_nodes
+
+        if sparse:
+            # Posiciones fuera de la diagonal: código c -> (c // (n-1), columna
+            # c % (n-1) saltando la diagonal)
+            num_edges = rng.binomial(n * (n - 1), density)
+            codes = rng.choice(n * (n - 1), size=num_edges, replace=False)
+            sources = codes // (n - 1)
+            targets = codes % (n - 1)
+            targets += targets >= sources
+        else:
+            mask = rng.random((n, n)) < density
+            np.fill_diagonal(mask, False)
+            sources, targets = np.nonzero(mask)
+        weights = rng.integers(min_weight, max_weight, size=len(sources),
+                               endpoint=True).astype(np.float64)
 
-        # Asegurar conectividad mínima creando un árbol de expansión
-        if ensure_connected and num_nodes > 1:
-            nodes = list(range(num_nodes))
-            random.shuffle(nodes)
+        # Asegurar conectividad mínima con un camino que recorre todos los
+        # nodos en orden aleatorio; sus pesos reemplazan a los sorteados
+        if ensure_connected:
+            nodes = rng.permutation(n)
+            path_sources, path_targets = nodes[:-1], nodes[1:]
+            path_weights = rng.integers(min_weight, max_weight, size=n - 1,
+                                        endpoint=True).astype(np.float64)
+            keep = ~np.isin(sources * n + targets, path_sources * n + path_targets)
+            sources = np.concatenate([sources[keep], path_sources])
+            targets = np.concatenate([targets[keep], path_targets])
+            weights = np.concatenate([weights[keep], path_weights])
 
-            # Crear camino que conecte todos los nodos
-            for i in range(len(nodes) - 1):
-                weight = random.randint(min_weight, max_weight)
-                graph.add_edge(nodes[i], nodes[i + 1], weight)
+        # Igual que add_edge, se descartan los pesos no positivos
+        valid = weights > 0
+        sources, targets, weights = sources[valid], targets[valid], weights[valid]
 
-        # Agregar aristas adicionales según la densidad
-        for i in range(num_nodes):
-            for j in range(num_nodes):
-                if i != j:
-                    # Si ya existe una arista, no la sobrescribimos
-                    if graph.adjacency_matrix[i][j] == np.inf:
-                        if random.random() < density:
-                            weight = random.randint(min_weight, max_weight)
-                            graph.add_edge(i, j, weight)
+        graph = Graph(n, sparse=sparse)
+        if sparse:
+            graph._build_csr(sources, targets, weights)
+        else:
+            graph.adjacency_matrix[sources, targets] = weights
 
         return graph
 
+    def max_integer_weight(self) -> Optional[int]:
+        """
+        Obtiene el peso máximo de las aristas cuando todos los pesos son
+        enteros. El resultado se guarda hasta la siguiente modificación.
+
+        Returns:
+            Peso máximo (0 si no hay aristas), o None si algún peso no es
+            entero
+        """
+        if self._integer_weight_bound is False:
+            if self.sparse:
+                self.compact()
+                weights = self.csr_weights
+            else:
+                finite = self.adjacency_matrix != np.inf
+                np.fill_diagonal(finite, False)
+                weights = self.adjacency_matrix[finite]
+
+            if len(weights) == 0:
+                self._integer_weight_bound = 0
+            elif np.all(weights == np.floor(weights)):
+                self._integer_weight_bound = int(weights.max())
+            else:
+                self._integer_weight_bound = None
+        return self._integer_weight_bound
+
     def get_adjacency_matrix(self) -> np.ndarray:
         """
         Retorna una copia de la matriz de adyacencia.
@@ -171,6 +582,12 @@ class Graph:
         Returns:
             Copia de la matriz de adyacencia
         """
+        if self.sparse:
+            self.compact()
+            matrix = np.full((self.num_nodes, self.num_nodes), np.inf)
+            np.fill_diagonal(matrix, 0)
+            matrix[self._csr_sources(), self.csr_targets] = self.csr_weights
+            return matrix
         return self.adjacency_matrix.copy()
 
     def __str__(self) -> str:
@@ -184,10 +601,11 @@ class Graph:
         result += "Matriz de Adyacencia:\n"
 
         # Reemplazar infinito por '-' para mejor visualización
+        matrix = self.get_adjacency_matrix() if self.sparse else self.adjacency_matrix
         display_matrix = np.where(
-            self.adjacency_matrix == np.inf,
+            matrix == np.inf,
             -1,
-            self.adjacency_matrix
+            matrix
         )
 
         for row in display_matrix:
@@ -203,12 +621,46 @@ class Graph:
         Returns:
             Lista de tuplas (origen, destino, peso)
         """
-        edges = []
-        for i in range(self.num_nodes):
-            for j in range(self.num_nodes):
-                if self.adjacency_matrix[i][j] != np.inf and i != j:
-                    edges.append((i, j, self.adjacency_matrix[i][j]))
-        return edges
+        sources, targets, weights = self.get_edge_arrays()
+        return list(zip(sources.tolist(), targets.tolist(), weights.tolist()))
+
+    def get_edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Obtiene las aristas del grafo como arreglos, ordenadas por origen y
+        luego por destino.
+
+        Returns:
+            Tupla (orígenes, destinos, pesos)
+        """
+        if self.sparse:
+            self.compact()
+            return self._csr_sources(), self.csr_targets.astype(np.int64), self.csr_weights.copy()
+
+        mask = self.adjacency_matrix != np.inf
+        np.fill_diagonal(mask, False)
+        sources, targets = np.nonzero(mask)
+        return sources, targets, self.adjacency_matrix[sources, targets]
+
+    def fingerprint(self) -> str:
+        """
+        Calcula una huella del contenido del grafo: número de nodos, número
+        de aristas y hash de los arreglos de aristas. A diferencia de
+        version, identifica el grafo y no cambia al copiarlo, guardarlo o
+        cargarlo, por lo que sirve para validar índices guardados en disco.
+        Se recalcula solo cuando el grafo cambia.
+
+        Returns:
+            Huella hexadecimal
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self.version:
+            sources, targets, weights = self.get_edge_arrays()
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(struct.pack('<QQ', self.num_nodes, len(sources)))
+            digest.update(np.ascontiguousarray(sources, dtype='<i8').tobytes())
+            digest.update(np.ascontiguousarray(targets, dtype='<i8').tobytes())
+            digest.update(np.ascontiguousarray(weights, dtype='<f8').tobytes())
+            self._fingerprint = (self.version, digest.hexdigest())
+        return self._fingerprint[1]
 
     def copy(self) -> 'Graph':
         """
@@ -217,7 +669,364 @@ class Graph:
         Returns:
             Copia del grafo
         """
-        new_graph = Graph(self.num_nodes)
-        new_graph.adjacency_matrix = self.adjacency_matrix.copy()
+        new_graph = Graph(self.num_nodes, sparse=self.sparse)
+        if self.sparse:
+            new_graph.csr_offsets = self.csr_offsets.copy()
+            new_graph.csr_targets = self.csr_targets.copy()
+            new_graph.csr_weights = self.csr_weights.copy()
+            new_graph._pending = {u: row.copy() for u, row in self._pending.items()}
+            new_graph._pending_count = self._pending_count
+        else:
+            new_graph.adjacency_matrix = self.adjacency_matrix.copy()
         new_graph.node_labels = self.node_labels.copy()
-        return new_graph
\ No newline at end of file
+        new_graph.landmarks = self.landmarks
+        new_graph.landmark_from = self.landmark_from
+        new_graph.landmark_to = self.landmark_to
+        return new_graph
+
+    @classmethod
+    def from_arrays(cls, num_nodes: int, adjacency_matrix: Optional[np.ndarray] = None,
+                    csr: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> 'Graph':
+        """
+        Crea un grafo sobre arreglos existentes sin copiarlos, por ejemplo
+        bloques de memoria compartida o archivos mapeados en memoria.
+
+        Args:
+            num_nodes: Número de nodos del grafo
+            adjacency_matrix: Matriz N×N para el backend denso
+            csr: Tupla (offsets, targets, weights) para el backend disperso
+
+        Returns:
+            Grafo que usa directamente los arreglos recibidos
+        """
+        if (adjacency_matrix is None) == (csr is None):
+            raise ValueError("Se debe indicar la matriz de adyacencia o los arreglos CSR")
+
+        graph = cls(0, sparse=csr is not None)
+        graph.num_nodes = num_nodes
+        if csr is not None:
+            graph.csr_offsets, graph.csr_targets, graph.csr_weights = csr
+        else:
+            graph.adjacency_matrix = adjacency_matrix
+        graph.node_labels = [str(i) for i in range(num_nodes)]
+        graph._out_edges = [None] * num_nodes
+        return graph
+
+    def save(self, filename: str) -> None:
+        """
+        Guarda el grafo en un archivo binario que load() puede abrir
+        mapeado en memoria.
+
+        El archivo contiene el encabezado, las etiquetas de los nodos (solo
+        si difieren de las predeterminadas) y los arreglos CSR
+        (offsets, targets, weights) o la matriz de adyacencia, cada sección
+        alineada a 64 bytes.
+
+        Args:
+            filename: Ruta del archivo
+        """
+        if self.sparse:
+            self.compact()
+            arrays = [self.csr_offsets.astype(np.int64, copy=False),
+                      self.csr_targets.astype(np.int32, copy=False),
+                      self.csr_weights.astype(np.float64, copy=False)]
+            num_edges = len(self.csr_targets)
+        else:
+            arrays = [self.adjacency_matrix.astype(np.float64, copy=False)]
+            num_edges = 0
+
+        default_labels = all(label == str(i) for i, label in enumerate(self.node_labels))
+        labels = b'' if default_labels else '\n'.join(self.node_labels).encode('utf-8')
+
+        with open(filename, 'wb') as f:
+            f.write(self._FILE_HEADER.pack(self.FILE_MAGIC, self.FILE_FORMAT, int(self.sparse),
+                                           self.num_nodes, num_edges, len(labels)))
+            for section in [labels] + arrays:
+                f.write(b'\x00' * (-f.tell() % self._FILE_ALIGN))
+                f.write(section if isinstance(section, bytes)
+                        else np.ascontiguousarray(section).tobytes())
+
+    @classmethod
+    def load(cls, filename: str, mmap: bool = True) -> 'Graph':
+        """
+        Carga un grafo guardado con save().
+
+        Con mmap=True los arreglos se abren con np.memmap en modo copia al
+        escribir: la carga es inmediata, las páginas se leen bajo demanda y
+        los procesos que abren el mismo archivo comparten la caché de
+        páginas del sistema. Las modificaciones posteriores del grafo no
+        alteran el archivo.
+
+        Args:
+            filename: Ruta del archivo
+            mmap: Si False, lee los arreglos completos en memoria
+
+        Returns:
+            Grafo cargado
+        """
+        with open(filename, 'rb') as f:
+            header = f.read(cls._FILE_HEADER.size)
+            if len(header) < cls._FILE_HEADER.size:
+                raise ValueError("Archivo de grafo inválido")
+            magic, file_format, sparse, num_nodes, num_edges, labels_size = \
+                cls._FILE_HEADER.unpack(header)
+            if magic != cls.FILE_MAGIC:
+                raise ValueError("Archivo de grafo inválido")
+            if file_format != cls.FILE_FORMAT:
+                raise ValueError(f"Formato de archivo no soportado: {file_format}")
+
+            offset = cls._FILE_HEADER.size
+            offset += -offset % cls._FILE_ALIGN
+            f.seek(offset)
+            labels = f.read(labels_size).decode('utf-8')
+            offset += labels_size
+
+        def read_array(dtype, shape):
+            nonlocal offset
+            offset += -offset % cls._FILE_ALIGN
+            count = int(np.prod(shape))
+            if count == 0:
+                array = np.empty(shape, dtype=dtype)
+            elif mmap:
+                array = np.memmap(filename, dtype=dtype, mode='c', offset=offset, shape=shape)
+            else:
+                array = np.fromfile(filename, dtype=dtype, count=count,
+                                    offset=offset).reshape(shape)
+            offset += count * np.dtype(dtype).itemsize
+            return array
+
+        if sparse:
+            graph = cls.from_arrays(num_nodes, csr=(read_array(np.int64, (num_nodes + 1,)),
+                                                    read_array(np.int32, (num_edges,)),
+                                                    read_array(np.float64, (num_edges,))))
+        else:
+            graph = cls.from_arrays(num_nodes,
+                                    adjacency_matrix=read_array(np.float64, (num_nodes, num_nodes)))
+
+        if labels_size:
+            graph.node_labels = labels.split('\n')
+        return graph
+
+    def _edge_changed(self, source: int, dest: int, weight: float) -> None:
+        """
+        Actualiza los índices derivados tras modificar una arista.
+
+        Args:
+            source: Nodo origen de la arista modificada
+            dest: Nodo destino de la arista modificada
+            weight: Nuevo peso (infinito si la arista fue eliminada)
+        """
+        self.version += 1
+        self._out_edges[source] = None
+        self._integer_weight_bound = False
+        self.landmarks = self.landmark_from = self.landmark_to = None
+
+        if self._in_edges is not None and source != dest:
+            # Se reemplaza la lista para no alterar iteraciones en curso
+            predecessors = [(u, w) for u, w in self._in_edges[dest] if u != source]
+            if weight != np.inf:
+                predecessors.append((source, float(weight)))
+            self._in_edges[dest] = predecessors
+
+    @staticmethod
+    def _edge_arrays(sources, dests) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convierte los nodos de un lote de aristas en arreglos de enteros.
+
+        Args:
+            sources: Nodos origen
+            dests: Nodos destino
+
+        Returns:
+            Tupla (orígenes, destinos) como arreglos int64 del mismo largo
+        """
+        sources = np.asarray(sources, dtype=np.int64).ravel()
+        dests = np.asarray(dests, dtype=np.int64).ravel()
+        if sources.shape != dests.shape:
+            raise ValueError("Los arreglos de orígenes y destinos deben tener el mismo largo")
+        return sources, dests
+
+    def _valid_edges(self, sources: np.ndarray, dests: np.ndarray) -> np.ndarray:
+        """
+        Marca las aristas de un lote con ambos extremos en rango y sin lazos.
+
+        Args:
+            sources: Nodos origen
+            dests: Nodos destino
+
+        Returns:
+            Arreglo booleano con las aristas válidas
+        """
+        return ((sources >= 0) & (sources < self.num_nodes) &
+                (dests >= 0) & (dests < self.num_nodes) & (sources != dests))
+
+    def _apply_edges(self, sources: np.ndarray, dests: np.ndarray,
+                     weights: np.ndarray) -> int:
+        """
+        Escribe un lote de aristas ya validadas e invalida los índices
+        derivados una sola vez.
+
+        Args:
+            sources: Nodos origen
+            dests: Nodos destino
+            weights: Pesos (infinito para eliminar la arista)
+
+        Returns:
+            Cantidad de aristas del lote
+        """
+        if len(sources) == 0:
+            return 0
+
+        # Conservar la última aparición de cada arista
+        codes = sources * self.num_nodes + dests
+        _, last = np.unique(codes[::-1], return_index=True)
+        keep = len(codes) - 1 - last
+        sources, dests, weights = sources[keep], dests[keep], weights[keep]
+
+        if not self.sparse:
+            self.adjacency_matrix[sources, dests] = weights
+        elif len(sources) + self._pending_count <= max(self.MIN_PENDING_COMPACT,
+                                                       len(self.csr_targets)):
+            # Lote pequeño frente al CSR: acumular como cambios pendientes
+            for u, v, weight in zip(sources.tolist(), dests.tolist(), weights.tolist()):
+                row = self._pending.setdefault(u, {})
+                if v not in row:
+                    self._pending_count += 1
+                row[v] = weight
+        else:
+            self.compact()
+            self._merge_csr(sources, dests, weights)
+
+        self.version += 1
+        for u in np.unique(sources).tolist():
+            self._out_edges[u] = None
+        self._integer_weight_bound = False
+        self.landmarks = self.landmark_from = self.landmark_to = None
+        # El índice inverso se reconstruye en la próxima consulta
+        self._in_edges = None
+        return len(sources)
+
+    def compact(self) -> None:
+        """
+        Consolida los cambios pendientes del backend disperso en los
+        arreglos CSR. No tiene efecto en grafos densos.
+        """
+        if not self.sparse or not self._pending:
+            return
+
+        p_src = np.fromiter((u for u, row in self._pending.items() for _ in row),
+                            dtype=np.int64, count=self._pending_count)
+        p_dst = np.fromiter((v for row in self._pending.values() for v in row),
+                            dtype=np.int64, count=self._pending_count)
+        p_weight = np.fromiter((w for row in self._pending.values() for w in row.values()),
+                               dtype=np.float64, count=self._pending_count)
+
+        self._pending = {}
+        self._pending_count = 0
+        self._merge_csr(p_src, p_dst, p_weight)
+
+    def _merge_csr(self, p_src: np.ndarray, p_dst: np.ndarray, p_weight: np.ndarray) -> None:
+        """
+        Reconstruye el CSR aplicando cambios sin duplicados sobre las
+        aristas almacenadas.
+
+        Args:
+            p_src: Nodos origen de los cambios
+            p_dst: Nodos destino de los cambios
+            p_weight: Nuevos pesos (infinito para eliminar la arista)
+        """
+        n = self.num_nodes
+        # Descartar las entradas CSR reemplazadas o eliminadas por los cambios
+        sources = self._csr_sources()
+        keep = ~np.isin(sources * n + self.csr_targets, p_src * n + p_dst)
+        alive = p_weight != np.inf
+
+        self._build_csr(np.concatenate([sources[keep], p_src[alive]]),
+                        np.concatenate([self.csr_targets[keep], p_dst[alive]]),
+                        np.concatenate([self.csr_weights[keep], p_weight[alive]]))
+
+    def _build_csr(self, sources: np.ndarray, targets: np.ndarray,
+                   weights: np.ndarray) -> None:
+        """
+        Reconstruye los arreglos CSR a partir de aristas sin duplicados.
+
+        Args:
+            sources: Nodos origen
+            targets: Nodos destino
+            weights: Pesos de las aristas
+        """
+        order = np.lexsort((targets, sources))
+        self.csr_targets = targets[order].astype(np.int32)
+        self.csr_weights = weights[order].astype(np.float64)
+        self.csr_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.num_nodes),
+                  out=self.csr_offsets[1:])
+
+    def _csr_sources(self) -> np.ndarray:
+        """
+        Expande los offsets CSR al nodo origen de cada arista almacenada.
+
+        Returns:
+            Arreglo con el origen de cada posición de csr_targets
+        """
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64),
+                         np.diff(self.csr_offsets))
+
+    def _csr_lookup(self, source: int, dest: int) -> float:
+        """
+        Busca el peso de una arista consolidada en los arreglos CSR.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+
+        Returns:
+            Peso de la arista o infinito si no existe
+        """
+        start, end = self.csr_offsets[source], self.csr_offsets[source + 1]
+        pos = start + np.searchsorted(self.csr_targets[start:end], dest)
+        if pos < end and self.csr_targets[pos] == dest:
+            return float(self.csr_weights[pos])
+        return np.inf
+
+    def _sparse_neighbors(self, node: int) -> List[Tuple[int, float]]:
+        """
+        Obtiene los vecinos de un nodo en el backend disperso, combinando
+        la fila CSR con los cambios pendientes.
+
+        Args:
+            node: Nodo a consultar
+
+        Returns:
+            Lista de tuplas (vecino, peso) ordenada por vecino, igual que
+            en el backend denso
+        """
+        start, end = self.csr_offsets[node], self.csr_offsets[node + 1]
+        neighbors = zip(self.csr_targets[start:end].tolist(),
+                        self.csr_weights[start:end].tolist())
+
+        pending = self._pending.get(node)
+        if not pending:
+            return list(neighbors)
+
+        row = dict(neighbors)
+        row.update(pending)
+        return [(v, w) for v, w in sorted(row.items()) if w != np.inf]
+
+    def _set_pending(self, source: int, dest: int, weight: float) -> None:
+        """
+        Registra un cambio de arista en el backend disperso y consolida
+        cuando los cambios pendientes superan el tamaño del CSR.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            weight: Nuevo peso (infinito para eliminar la arista)
+        """
+        row = self._pending.setdefault(source, {})
+        if dest not in row:
+            self._pending_count += 1
+        row[dest] = float(weight)
+
+        if self._pending_count > max(self.MIN_PENDING_COMPACT, len(self.csr_targets)):
+            self.compact()
\ No newline at end of file
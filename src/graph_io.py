@@ -0,0 +1,182 @@
+import os
+import re
+import numpy as np
+from typing import Optional
+from graph import Graph
+
+
+# Formatos soportados por import_graph:
+# - 'edgelist': líneas "origen destino [peso]" separadas por espacios,
+#   nodos desde 0, comentarios con '#' o '%'
+# - 'csv': igual que 'edgelist' separado por comas, con encabezado opcional
+# - 'dimacs': archivos .gr del 9th DIMACS Challenge ("p sp N M",
+#   "a origen destino peso"), nodos desde 1, comentarios con 'c'
+FORMATS = ('auto', 'edgelist', 'csv', 'dimacs')
+
+_COMMENT_LINES = {
+    'edgelist': re.compile(r'^\s*[#%].*$', re.M),
+    'csv': re.compile(r'^\s*[#%].*$', re.M),
+    'dimacs': re.compile(r'^\s*[cp].*$', re.M),
+}
+_DIMACS_PROBLEM = re.compile(r'^\s*p\s+\S+\s+(\d+)\s+(\d+)', re.M)
+_WHITESPACE = np.frombuffer(b' \t\n\r\x0b\x0c', dtype=np.uint8)
+
+
+def import_graph(filename: str, fmt: str = 'auto', num_nodes: Optional[int] = None,
+                 sparse: bool = True, chunk_bytes: int = 1 << 24) -> Graph:
+    """
+    Importa un grafo desde un archivo de aristas leyéndolo por bloques.
+
+    Cada bloque de líneas se convierte en arreglos NumPy sin llamadas por
+    arista; la memoria temporal queda acotada por chunk_bytes más los
+    arreglos de aristas, que se insertan con Graph.add_edges (las aristas
+    repetidas conservan el último peso y se descartan los lazos y los pesos
+    no positivos). Las líneas sin peso usan peso 1.
+
+    Args:
+        filename: Ruta del archivo
+        fmt: Formato del archivo (ver FORMATS); 'auto' lo deduce de la
+            extensión (.gr, .csv o lista de aristas)
+        num_nodes: Número de nodos; por defecto el de la línea "p" en
+            DIMACS o el mayor índice encontrado más uno
+        sparse: Si True, crea el grafo con almacenamiento CSR
+        chunk_bytes: Tamaño aproximado de cada bloque leído
+
+    Returns:
+        Grafo con las aristas del archivo
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    if fmt == 'auto':
+        extension = os.path.splitext(filename)[1].lower()
+        fmt = {'.gr': 'dimacs', '.csv': 'csv'}.get(extension, 'edgelist')
+
+    sources, targets, weights = [], [], []
+    columns = None
+    declared_nodes = None
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            text = ''.join(lines)
+
+            if fmt == 'dimacs':
+                problem = _DIMACS_PROBLEM.search(text)
+                if problem is not None:
+                    declared_nodes = int(problem.group(1))
+                # Tras quitar comentarios solo quedan líneas de arcos "a u v w"
+                text = _COMMENT_LINES[fmt].sub('', text).replace('a', ' ')
+            else:
+                text = _COMMENT_LINES[fmt].sub('', text)
+                if fmt == 'csv':
+                    text = text.replace(',', ' ')
+
+            if columns is None:
+                text, columns = _detect_columns(text, fmt)
+                if columns is None:
+                    continue
+
+            if not _same_columns(text, columns):
+                raise ValueError(f"Número de columnas inconsistente en {filename}")
+            try:
+                values = np.array(text.split(), dtype=np.float64)
+            except ValueError:
+                raise ValueError(f"Línea inválida en {filename}")
+
+            values = values.reshape(-1, columns)
+            sources.append(values[:, 0].astype(np.int64))
+            targets.append(values[:, 1].astype(np.int64))
+            weights.append(values[:, 2] if columns > 2 else np.ones(len(values)))
+
+    sources = np.concatenate(sources) if sources else np.empty(0, dtype=np.int64)
+    targets = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+    weights = np.concatenate(weights) if weights else np.empty(0)
+
+    if fmt == 'dimacs':
+        sources -= 1
+        targets -= 1
+
+    if num_nodes is None:
+        num_nodes = declared_nodes
+    if num_nodes is None:
+        num_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+    if len(sources) and (min(sources.min(), targets.min()) < 0 or
+                         max(sources.max(), targets.max()) >= num_nodes):
+        raise ValueError("El archivo contiene nodos fuera de rango")
+
+    graph = Graph(num_nodes, sparse=sparse)
+    graph.add_edges(sources, targets, weights)
+    return graph
+
+
+def _detect_columns(text: str, fmt: str):
+    """
+    Determina el número de columnas a partir de la primera línea con datos,
+    descartándola si es un encabezado CSV.
+
+    Args:
+        text: Bloque de texto sin comentarios
+        fmt: Formato del archivo
+
+    Returns:
+        Tupla (texto restante, columnas); columnas es None si el bloque no
+        contiene datos
+    """
+    for line_end, line in _iter_lines(text):
+        tokens = line.split()
+        if not tokens:
+            continue
+        try:
+            [float(token) for token in tokens]
+        except ValueError:
+            if fmt != 'csv':
+                raise ValueError(f"Línea inválida: {line.strip()}")
+            # Encabezado: se descarta y se usa la siguiente línea
+            return _detect_columns(text[line_end:], 'edgelist')
+        if len(tokens) not in (2, 3):
+            raise ValueError(f"Se esperaban 2 o 3 columnas: {line.strip()}")
+        return text, len(tokens)
+    return text, None
+
+
+def _same_columns(text: str, columns: int) -> bool:
+    """
+    Verifica que todas las líneas con datos de un bloque tengan exactamente
+    columns campos, contando los campos de cada línea sobre los bytes del
+    bloque sin recorrerlo línea por línea.
+
+    Args:
+        text: Bloque de texto sin comentarios
+        columns: Número de columnas esperado
+
+    Returns:
+        True si todas las líneas no vacías tienen columns campos
+    """
+    data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    space = np.isin(data, _WHITESPACE)
+    # Un campo empieza en un byte no blanco precedido por un blanco
+    starts = ~space
+    starts[1:] &= space[:-1]
+    line = np.cumsum(data == ord('\n'))
+    counts = np.bincount(line[starts])
+    return bool(np.all((counts == 0) | (counts == columns)))
+
+
+def _iter_lines(text: str):
+    """
+    Recorre las líneas de un bloque junto con la posición de su final.
+
+    Args:
+        text: Bloque de texto
+
+    Yields:
+        Tuplas (posición tras la línea, línea)
+    """
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        end = len(text) if end == -1 else end + 1
+        yield end, text[start:end]
+        start = end
@@ -1,40 +1,152 @@
 import numpy as np
 from typing import List, Tuple, Optional, Dict
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
 import heapq
 from graph import Graph
+from contraction_hierarchies import ContractionHierarchy
+
+
+# Estado de cada proceso trabajador de generate_k_paths_matrix y query_batch
+_worker_state = {}
+
+
+def _leftist_merge(a: Optional[tuple], b: Optional[tuple]) -> Optional[tuple]:
+    """
+    Mezcla persistente de dos montículos izquierdistas.
+
+    Cada nodo es una tupla inmutable (clave, rango, izquierdo, derecho, u, v)
+    que representa la arista (u, v); los montículos originales no se
+    modifican y comparten sus subárboles con el resultado.
+
+    Args:
+        a: Raíz del primer montículo (o None)
+        b: Raíz del segundo montículo (o None)
+
+    Returns:
+        Raíz del montículo mezclado
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b[0] < a[0]:
+        a, b = b, a
+
+    key, _, left, right, u, v = a
+    right = _leftist_merge(right, b)
+    if left is None or left[1] < right[1]:
+        left, right = right, left
+    rank = (right[1] if right is not None else 0) + 1
+    return key, rank, left, right, u, v
 
 
 class KShortestPaths:
     """
     Implementación del algoritmo de Yen para encontrar los K caminos más cortos.
+
+    Algoritmos disponibles:
+    - 'yen': Yen clásico, un Dijkstra completo por cada nodo de desviación
+    - 'yen_spt': Yen sin ciclos que reutiliza el árbol inverso de caminos
+      más cortos hacia el destino y la desviación de Lawler
+    - 'eppstein': algoritmo de Eppstein con montículos persistentes, en
+      O(m log m + k log k) tras un único Dijkstra; genera recorridos que
+      pueden repetir nodos (no necesariamente caminos simples)
     """
 
-    def __init__(self, graph: Graph):
+    ALGORITHMS = ('yen', 'yen_spt', 'eppstein')
+
+    # Estrategias de búsqueda para dijkstra():
+    # - 'auto': A* con landmarks si el grafo fue preprocesado, cola de
+    #   buckets si los pesos son enteros pequeños, heap en otro caso
+    # - 'heap': cola de prioridad binaria (heapq)
+    # - 'bucket': cola de buckets de Dial (requiere pesos enteros)
+    # - 'bidirectional': búsquedas simultáneas desde el origen y hacia el
+    #   destino sobre el índice inverso del grafo
+    # - 'alt': A* con cotas de landmarks (requiere Graph.preprocess_landmarks);
+    #   si el grafo cambia y descarta sus landmarks, se usa la selección de
+    #   'auto' hasta volver a preprocesarlo
+    # - 'ch': Contraction Hierarchies para consultas sin aristas excluidas;
+    #   las búsquedas de desviación usan la selección de 'auto'
+    SEARCHES = ('auto', 'heap', 'bucket', 'bidirectional', 'alt', 'ch')
+
+    # Peso entero máximo para elegir automáticamente la cola de buckets
+    MAX_BUCKET_WEIGHT = 256
+
+    def __init__(self, graph: Graph, algorithm: str = 'yen', search: str = 'auto',
+                 cache_size: int = 1024):
         """
         Inicializa el algoritmo con un grafo.
 
         Args:
             graph: Grafo sobre el cual calcular los k-paths
+            algorithm: Variante a utilizar (ver ALGORITHMS)
+            search: Estrategia de búsqueda de dijkstra() (ver SEARCHES)
+            cache_size: Máximo de pares (origen, destino) cuyos caminos se
+                conservan en la caché LRU de find_k_shortest_paths; 0 la
+                desactiva
         """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Algoritmo desconocido: {algorithm}")
+        if search not in self.SEARCHES:
+            raise ValueError(f"Estrategia de búsqueda desconocida: {search}")
+
         self.graph = graph
         self.num_nodes = graph.num_nodes
+        self.algorithm = algorithm
+        self.search = search
+        # Cotas ALT del último destino consultado: (tabla, destino, cotas)
+        self._alt_bounds = None
+        # Índice de Contraction Hierarchies (ver build_contraction_hierarchy)
+        self.contraction_hierarchy: Optional[ContractionHierarchy] = None
+        # Caché LRU (origen, destino) -> (k calculado, caminos), válida
+        # mientras la versión del grafo coincida con _cache_version
+        self.cache_size = cache_size
+        self._path_cache: OrderedDict = OrderedDict()
+        self._cache_version = graph.version
 
     def dijkstra(self, source: int, dest: int,
-                 excluded_edges: set = None) -> Tuple[Optional[List[int]], float]:
+                 excluded_edges=None) -> Tuple[Optional[List[int]], float]:
         """
         Algoritmo de Dijkstra para encontrar el camino más corto.
 
         Args:
             source: Nodo origen
             dest: Nodo destino
-            excluded_edges: Conjunto de aristas excluidas (tuplas (u, v))
+            excluded_edges: Aristas excluidas, como conjunto de tuplas (u, v)
+                o como diccionario {u: vecinos excluidos de u}
 
         Returns:
             Tupla (camino, costo). Retorna (None, inf) si no hay camino.
         """
+        # Las búsquedas consultan las exclusiones una vez por nodo asentado
+        # (excluded_edges.get(u)) en lugar de una tupla por arista relajada
         if excluded_edges is None:
-            excluded_edges = set()
+            excluded_edges = {}
+        elif not isinstance(excluded_edges, dict):
+            grouped = {}
+            for u, v in excluded_edges:
+                grouped.setdefault(u, set()).add(v)
+            excluded_edges = grouped
+
+        if self.search == 'bidirectional':
+            return self._bidirectional_dijkstra(source, dest, excluded_edges)
+
+        if self.search == 'ch' and not excluded_edges:
+            return self._current_hierarchy().query(source, dest)
+
+        if self.search in ('auto', 'alt', 'ch') and self.graph.landmarks is not None:
+            return self._alt_dijkstra(source, dest, excluded_edges)
+
+        if self.search != 'heap':
+            max_weight = self.graph.max_integer_weight()
+            if self.search == 'bucket' and max_weight is None:
+                raise ValueError("La cola de buckets requiere pesos enteros")
+            if max_weight is not None and (self.search == 'bucket' or
+                                           max_weight <= self.MAX_BUCKET_WEIGHT):
+                return self._bucket_dijkstra(source, dest, excluded_edges, max_weight)
 
         # Inicialización
         distances = [np.inf] * self.num_nodes
@@ -63,10 +175,10 @@ class KShortestPaths:
                 path.reverse()
                 return path, distances[dest]
 
-            # Explorar vecinos
+            # Explorar vecinos, omitiendo las aristas excluidas
+            excluded = excluded_edges.get(u, ())
             for v, weight in self.graph.get_neighbors(u):
-                # Verificar si la arista está excluida
-                if (u, v) in excluded_edges:
+                if v in excluded:
                     continue
 
                 new_dist = distances[u] + weight
@@ -79,7 +191,248 @@ class KShortestPaths:
         # No se encontró camino
         return None, np.inf
 
-    def find_k_shortest_paths(self, source: int, dest: int, k: int) -> List[Tuple[List[int], float]]:
+    def _bucket_dijkstra(self, source: int, dest: int, excluded_edges: dict,
+                         max_weight: int) -> Tuple[Optional[List[int]], float]:
+        """
+        Dijkstra con la cola de buckets de Dial para pesos enteros en
+        [1, max_weight]: un arreglo circular de max_weight + 1 listas
+        indexado por distancia, sin tuplas ni operaciones de heap.
+        Costo O(m + n·C) con C = max_weight.
+
+        Los nodos de un mismo bucket se procesan en orden creciente, igual
+        que el desempate de heapq, por lo que el resultado es idéntico al
+        de la versión con heap.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            excluded_edges: Diccionario {u: vecinos excluidos de u}
+            max_weight: Peso entero máximo del grafo
+
+        Returns:
+            Tupla (camino, costo). Retorna (None, inf) si no hay camino.
+        """
+        num_buckets = max_weight + 1
+        buckets = [[] for _ in range(num_buckets)]
+
+        distances = [np.inf] * self.num_nodes
+        distances[source] = 0
+        previous = [-1] * self.num_nodes
+        visited = [False] * self.num_nodes
+
+        buckets[0].append(source)
+        queued = 1
+        current = 0
+
+        while queued:
+            bucket = buckets[current % num_buckets]
+
+            # Los pesos son >= 1: nada se agrega al bucket actual mientras
+            # se procesa, así que basta con ordenarlo una vez
+            bucket.sort(reverse=True)
+            while bucket:
+                u = bucket.pop()
+                queued -= 1
+
+                if visited[u] or distances[u] != current:
+                    continue
+                visited[u] = True
+
+                if u == dest:
+                    path = []
+                    node = dest
+                    while node != -1:
+                        path.append(node)
+                        node = previous[node]
+                    path.reverse()
+                    return path, distances[dest]
+
+                excluded = excluded_edges.get(u, ())
+                for v, weight in self.graph.get_neighbors(u):
+                    if v in excluded:
+                        continue
+
+                    new_dist = current + weight
+                    if new_dist < distances[v]:
+                        distances[v] = new_dist
+                        previous[v] = u
+                        buckets[int(new_dist) % num_buckets].append(v)
+                        queued += 1
+
+            current += 1
+
+        return None, np.inf
+
+    def build_contraction_hierarchy(self, witness_settle_limit: int = 64) -> ContractionHierarchy:
+        """
+        Construye el índice de Contraction Hierarchies del grafo y lo
+        asocia a esta instancia para las búsquedas con search='ch'.
+
+        Args:
+            witness_settle_limit: Límite de la búsqueda de testigos
+                (ver ContractionHierarchy.build)
+
+        Returns:
+            Índice construido, que puede guardarse con save()
+        """
+        self.contraction_hierarchy = ContractionHierarchy.build(self.graph, witness_settle_limit)
+        return self.contraction_hierarchy
+
+    def _current_hierarchy(self) -> ContractionHierarchy:
+        """
+        Retorna el índice de Contraction Hierarchies, reconstruyéndolo si no
+        existe o si fue construido sobre otro grafo (según Graph.fingerprint,
+        que también valida los índices cargados con load()).
+
+        Returns:
+            Índice vigente
+        """
+        hierarchy = self.contraction_hierarchy
+        if hierarchy is None or hierarchy.graph_fingerprint != self.graph.fingerprint():
+            hierarchy = self.build_contraction_hierarchy()
+        return hierarchy
+
+    def _bidirectional_dijkstra(self, source: int, dest: int,
+                                excluded_edges: dict) -> Tuple[Optional[List[int]], float]:
+        """
+        Dijkstra bidireccional: avanza desde source por las aristas
+        salientes y desde dest por las entrantes (Graph.get_predecessors),
+        expandiendo siempre el lado con menor distancia pendiente. Termina
+        cuando la suma de los mínimos de ambas colas alcanza el mejor camino
+        encontrado, lo que en grafos dispersos grandes asienta
+        aproximadamente la mitad de nodos que la búsqueda unidireccional.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            excluded_edges: Diccionario {u: vecinos excluidos de u}
+
+        Returns:
+            Tupla (camino, costo). Retorna (None, inf) si no hay camino.
+        """
+        if source == dest:
+            return [source], 0
+
+        # Índice 0: búsqueda hacia adelante, índice 1: hacia atrás
+        distances = ({source: 0}, {dest: 0})
+        previous = ({source: -1}, {dest: -1})
+        settled = (set(), set())
+        queues = ([(0, source)], [(0, dest)])
+
+        best_cost = np.inf
+        meeting_node = -1
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best_cost:
+                break
+
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            current_dist, u = heapq.heappop(queues[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+
+            if side == 0:
+                edges = self.graph.get_neighbors(u)
+            else:
+                edges = self.graph.get_predecessors(u)
+
+            own, other = distances[side], distances[1 - side]
+            excluded = excluded_edges.get(u, ()) if side == 0 else ()
+            for v, weight in edges:
+                if v in excluded or (side == 1 and u in excluded_edges.get(v, ())):
+                    continue
+
+                new_dist = current_dist + weight
+                if new_dist < own.get(v, np.inf):
+                    own[v] = new_dist
+                    previous[side][v] = u
+                    heapq.heappush(queues[side], (new_dist, v))
+
+                    if v in other and new_dist + other[v] < best_cost:
+                        best_cost = new_dist + other[v]
+                        meeting_node = v
+
+        if meeting_node == -1:
+            return None, np.inf
+
+        path = []
+        node = meeting_node
+        while node != -1:
+            path.append(node)
+            node = previous[0][node]
+        path.reverse()
+
+        node = previous[1][meeting_node]
+        while node != -1:
+            path.append(node)
+            node = previous[1][node]
+
+        return path, best_cost
+
+    def _alt_dijkstra(self, source: int, dest: int,
+                      excluded_edges: dict) -> Tuple[Optional[List[int]], float]:
+        """
+        A* dirigido al destino con las cotas de landmarks del grafo (ALT).
+        La heurística es consistente, por lo que cada nodo se asienta una
+        sola vez, y las cotas infinitas podan los nodos que no alcanzan dest.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            excluded_edges: Diccionario {u: vecinos excluidos de u}
+
+        Returns:
+            Tupla (camino, costo). Retorna (None, inf) si no hay camino.
+        """
+        # Las búsquedas de desviación de Yen comparten destino: reutilizar
+        # las cotas mientras no cambien las tablas del grafo
+        cached = self._alt_bounds
+        if cached is None or cached[0] is not self.graph.landmark_from or cached[1] != dest:
+            bounds = self.graph.landmark_lower_bounds(dest).tolist()
+            self._alt_bounds = (self.graph.landmark_from, dest, bounds)
+        else:
+            bounds = cached[2]
+
+        if bounds[source] == np.inf:
+            return None, np.inf
+
+        distances = {source: 0}
+        previous = {source: -1}
+        closed = set()
+        pq = [(bounds[source], source)]
+
+        while pq:
+            _, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+
+            if u == dest:
+                path = []
+                node = dest
+                while node != -1:
+                    path.append(node)
+                    node = previous[node]
+                path.reverse()
+                return path, distances[dest]
+
+            excluded = excluded_edges.get(u, ())
+            for v, weight in self.graph.get_neighbors(u):
+                if v in excluded or bounds[v] == np.inf:
+                    continue
+
+                new_dist = distances[u] + weight
+                if new_dist < distances.get(v, np.inf):
+                    distances[v] = new_dist
+                    previous[v] = u
+                    heapq.heappush(pq, (new_dist + bounds[v], v))
+
+        return None, np.inf
+
+    def find_k_shortest_paths(self, source: int, dest: int, k: int,
+                              max_cost: Optional[float] = None,
+                              max_hops: Optional[int] = None) -> List[Tuple[List[int], float]]:
         """
         Encuentra los K caminos más cortos usando el algoritmo de Yen.
 
@@ -87,65 +440,320 @@ class KShortestPaths:
             source: Nodo origen
             dest: Nodo destino
             k: Número de caminos más cortos a encontrar
+            max_cost: Costo máximo de los caminos retornados (ver
+                iter_shortest_paths)
+            max_hops: Cantidad máxima de aristas por camino (ver
+                iter_shortest_paths)
 
         Returns:
             Lista de tuplas (camino, costo) ordenadas por costo
         """
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+
+        if source == dest and 0 <= source < self.num_nodes:
+            return [([source], 0)]
+
+        if max_cost is not None or max_hops is not None:
+            return list(islice(self.iter_shortest_paths(source, dest, k, max_cost, max_hops), k))
+
+        paths = self._cached_paths(source, dest, k)
+        if paths is None:
+            paths = list(islice(self.iter_shortest_paths(source, dest, k), k))
+            self._store_paths(source, dest, k, paths)
+        return [(list(path), cost) for path, cost in paths]
+
+    def _cached_paths(self, source: int, dest: int, k: int) -> Optional[List[Tuple[List[int], float]]]:
+        """
+        Busca en la caché los k primeros caminos de un par.
+
+        Una entrada calculada con un k mayor también responde consultas con
+        k menor, y una entrada con menos caminos que su k indica que no
+        existen más, por lo que responde cualquier k.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            k: Número de caminos solicitados
+
+        Returns:
+            Lista de caminos (compartida con la caché) o None si no está
+        """
+        if self._cache_version != self.graph.version:
+            self._path_cache.clear()
+            self._cache_version = self.graph.version
+            return None
+
+        entry = self._path_cache.get((source, dest))
+        if entry is None:
+            return None
+        computed_k, paths = entry
+        if computed_k < k and len(paths) == computed_k:
+            return None
+
+        self._path_cache.move_to_end((source, dest))
+        return paths[:k]
+
+    def _store_paths(self, source: int, dest: int, k: int,
+                     paths: List[Tuple[List[int], float]]) -> None:
+        """
+        Guarda en la caché los caminos calculados para un par, descartando
+        la entrada usada hace más tiempo si se supera cache_size.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            k: Número de caminos solicitados al calcular
+            paths: Caminos obtenidos (a lo sumo k)
+        """
+        if self.cache_size <= 0:
+            return
+        if self._cache_version != self.graph.version:
+            self._path_cache.clear()
+            self._cache_version = self.graph.version
+
+        entry = self._path_cache.get((source, dest))
+        if entry is not None and entry[0] > k:
+            return
+
+        self._path_cache[(source, dest)] = (k, paths)
+        self._path_cache.move_to_end((source, dest))
+        if len(self._path_cache) > self.cache_size:
+            self._path_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Descarta todos los caminos guardados en la caché."""
+        self._path_cache.clear()
+
+    def query_batch(self, pairs, k: int,
+                    workers: Optional[int] = None) -> List[List[Tuple[List[int], float]]]:
+        """
+        Calcula los K caminos más cortos de varios pares en una sola llamada.
+
+        Los pares repetidos o ya presentes en la caché no se recalculan. El
+        resto se agrupa por destino: con los motores 'yen_spt' y 'eppstein'
+        cada grupo calcula un único árbol inverso y deriva de él los caminos
+        de todos sus orígenes. Con 'yen' cada par ejecuta Yen clásico, pero
+        los grupos igual se pueden repartir entre procesos. Los resultados
+        se guardan en la caché como los de find_k_shortest_paths.
+
+        Args:
+            pairs: Secuencia de pares (origen, destino)
+            k: Número de caminos más cortos por par
+            workers: Número de procesos. Si es mayor que 1, reparte los
+                grupos entre un pool de procesos que comparten el grafo en
+                memoria compartida; el resultado es idéntico al serial.
+
+        Returns:
+            Lista con los caminos de cada par, en el orden de pairs (ver
+            find_k_shortest_paths)
+        """
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+
+        pairs = [(int(source), int(dest)) for source, dest in pairs]
+        results = {}
+        groups = defaultdict(list)
+
+        for source, dest in dict.fromkeys(pairs):
+            valid = 0 <= source < self.num_nodes and 0 <= dest < self.num_nodes
+            if not valid or source == dest:
+                results[(source, dest)] = self.find_k_shortest_paths(source, dest, k)
+                continue
+            paths = self._cached_paths(source, dest, k)
+            if paths is not None:
+                results[(source, dest)] = paths
+            else:
+                groups[dest].append(source)
+
+        groups = list(groups.items())
+        if workers is not None and workers > 1 and len(groups) > 1:
+            computed = self._query_groups_parallel(groups, k, workers)
+        else:
+            computed = self._query_groups(groups, k)
+
+        for source, dest, paths in computed:
+            self._store_paths(source, dest, k, paths)
+            results[(source, dest)] = paths
+
+        return [[(list(path), cost) for path, cost in results[pair]] for pair in pairs]
+
+    def _query_groups(self, groups, k: int) -> List[Tuple[int, int, list]]:
+        """
+        Calcula los caminos de pares agrupados por destino.
+
+        Args:
+            groups: Lista de tuplas (destino, orígenes)
+            k: Número de caminos por par
+
+        Returns:
+            Lista de tuplas (origen, destino, caminos)
+        """
+        computed = []
+        for dest, sources in groups:
+            if self.algorithm == 'yen':
+                for source in sources:
+                    paths = list(islice(self.iter_shortest_paths(source, dest, k), k))
+                    computed.append((source, dest, paths))
+                continue
+
+            tree = self.reverse_shortest_path_tree(dest)
+            for source in sources:
+                paths = list(islice(self._iter_from_tree(source, dest, tree, k), k))
+                computed.append((source, dest, paths))
+        return computed
+
+    def iter_shortest_paths(self, source: int, dest: int, limit: Optional[int] = None,
+                            max_cost: Optional[float] = None,
+                            max_hops: Optional[int] = None):
+        """
+        Genera los caminos más cortos entre dos nodos en orden de costo,
+        calculando cada uno solo cuando se solicita. El estado del algoritmo
+        (caminos aceptados y candidatos) se conserva entre llamadas a next(),
+        por lo que se puede detener la iteración en cualquier momento.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            limit: Cantidad máxima de caminos a generar; la iteración
+                termina al alcanzarla. Acota el montículo de candidatos a los
+                que aún pueden estar entre los primeros limit, sin cambiar
+                el resultado
+            max_cost: Si se indica, solo se generan caminos con costo menor
+                o igual. Con 'yen_spt' y 'eppstein' se omiten además las
+                desviaciones que no pueden cumplirlo; con 'yen' los caminos
+                no salen estrictamente en orden de costo, así que solo se
+                filtran los generados y limit cuenta los caminos enumerados
+                antes del filtro
+            max_hops: Si se indica, solo se generan caminos con a lo sumo
+                esa cantidad de aristas (no disponible con 'eppstein')
+
+        Yields:
+            Tuplas (camino, costo) ordenadas por costo
+        """
+        if max_hops is not None and self.algorithm == 'eppstein':
+            raise ValueError("max_hops no está disponible con el algoritmo 'eppstein'")
+
         if source < 0 or source >= self.num_nodes or dest < 0 or dest >= self.num_nodes:
-            return []
+            return
 
         if source == dest:
-            return [([source], 0)]
+            yield [source], 0
+            return
+
+        if self.algorithm == 'yen_spt':
+            yield from self._iter_yen_spt(source, dest, None, limit, max_cost, max_hops)
+        elif self.algorithm == 'eppstein':
+            yield from self._iter_eppstein(source, dest, None, limit, max_cost)
+        else:
+            yield from self._iter_yen(source, dest, limit, max_cost, max_hops)
 
-        # A: lista de k caminos más cortos
+    @staticmethod
+    def _cap_candidates(candidates: list, needed: int) -> None:
+        """
+        Conserva en un montículo de candidatos solo los needed mejores.
+
+        Un candidato descartado es peor que needed candidatos que se
+        conservan, por lo que nunca estaría entre los próximos needed
+        caminos emitidos. El recorte se hace cuando el montículo duplica
+        needed, para amortizar su costo.
+
+        Args:
+            candidates: Montículo (heapq) a recortar en su lugar
+            needed: Caminos que aún faltan por emitir
+        """
+        if len(candidates) > 2 * max(needed, 1):
+            candidates[:] = heapq.nsmallest(max(needed, 0), candidates)
+
+    def _iter_yen(self, source: int, dest: int, limit: Optional[int] = None,
+                  max_cost: Optional[float] = None, max_hops: Optional[int] = None):
+        """
+        Genera caminos en orden de costo con el algoritmo de Yen clásico.
+
+        Con max_hops, el primer camino y las desviaciones se buscan con
+        _hop_limited_search, por lo que todos los caminos enumerados
+        cumplen el límite. max_cost solo filtra los caminos emitidos: un
+        candidato caro puede originar desviaciones más baratas.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            limit: Cantidad máxima de caminos a enumerar (acota B)
+            max_cost: Costo máximo de los caminos emitidos
+            max_hops: Cantidad máxima de aristas por camino
+
+        Yields:
+            Tuplas (camino, costo) ordenadas por costo
+        """
+        # A: lista de caminos más cortos encontrados
         A = []
 
         # B: lista de caminos candidatos (heap) - usando tuplas para hashear
         B = []
-        # Set para verificación rápida de duplicados
+        # Sets para verificación rápida de duplicados
         B_set = set()
+        A_set = set()
+
+        # Índice de prefijos (trie) de todos los caminos de A y B: cada nodo
+        # es un diccionario {siguiente nodo: subárbol}, de modo que las
+        # aristas a excluir tras un root path son las claves de su subárbol
+        prefixes = {}
+
+        def index_path(path):
+            node = prefixes
+            for v in path:
+                node = node.setdefault(v, {})
 
         # Encontrar el primer camino más corto
-        first_path, first_cost = self.dijkstra(source, dest)
+        if max_hops is None:
+            first_path, first_cost = self.dijkstra(source, dest)
+        else:
+            tree = self.reverse_shortest_path_tree(dest)
+            hop_distances = self._hop_distances(dest)
+            first_path = self._hop_limited_search(source, dest, set(), set(), tree,
+                                                  max_hops, hop_distances)
+            first_cost = np.inf if first_path is None else self._path_cost(first_path)
 
         if first_path is None:
-            return []  # No hay camino
+            return  # No hay camino
+        # Ningún otro camino cuesta menos que el primero
+        if max_cost is not None and first_cost > max_cost:
+            return
 
         A.append((first_path, first_cost))
+        A_set.add(tuple(first_path))
+        index_path(first_path)
+        yield first_path, first_cost
 
-        # Encontrar k-1 caminos adicionales
-        for k_iter in range(1, k):
-            if not A:
-                break
-
+        # Encontrar caminos adicionales a medida que se soliciten
+        while limit is None or len(A) < limit:
             # El último camino encontrado
             prev_path, _ = A[-1]
 
+            # Subárbol del trie correspondiente al root path actual
+            prefix_node = prefixes
+
             # Para cada nodo en el camino anterior (excepto el último)
             for i in range(len(prev_path) - 1):
                 # Spur node: nodo donde se desviará el camino
                 spur_node = prev_path[i]
                 # Root path: parte del camino desde source hasta spur_node
                 root_path = prev_path[:i + 1]
+                prefix_node = prefix_node[spur_node]
 
-                # Aristas a excluir
-                excluded_edges = set()
-
-                # Excluir aristas que forman caminos similares encontrados previamente
-                for path, _ in A:
-                    if len(path) > i and path[:i + 1] == root_path:
-                        if i + 1 < len(path):
-                            excluded_edges.add((path[i], path[i + 1]))
-
-                # También excluir aristas ya exploradas en B
-                for cost, path_tuple in B:
-                    path = list(path_tuple)
-                    if len(path) > i and path[:i + 1] == root_path:
-                        if i + 1 < len(path):
-                            excluded_edges.add((path[i], path[i + 1]))
+                # Excluir las aristas (spur_node, v) de los caminos de A y B
+                # que comparten el root path: las claves de su subárbol
+                excluded_edges = {spur_node: prefix_node}
 
                 # Encontrar el camino más corto desde spur_node hasta dest
-                spur_path, spur_cost = self.dijkstra(spur_node, dest, excluded_edges)
+                if max_hops is None:
+                    spur_path, spur_cost = self.dijkstra(spur_node, dest, excluded_edges)
+                elif i < max_hops:
+                    spur_path = self._hop_limited_search(spur_node, dest, prefix_node, set(),
+                                                         tree, max_hops - i, hop_distances)
+                else:
+                    # La raíz ya usa todas las aristas permitidas
+                    spur_path = None
 
                 if spur_path is not None:
                     # Combinar root_path con spur_path
@@ -162,14 +770,20 @@ class KShortestPaths:
                     # Agregar a candidatos si no existe
                     if path_tuple not in B_set:
                         # Verificar que no esté en A
-                        path_in_A = any(tuple(p) == path_tuple for p, _ in A)
-                        if not path_in_A:
+                        if path_tuple not in A_set:
                             heapq.heappush(B, (total_cost, path_tuple))
                             B_set.add(path_tuple)
+                            index_path(path_tuple)
+
+            # Los candidatos descartados siguen en el trie, así que no
+            # pueden volver a generarse
+            if limit is not None and len(B) > 2 * max(limit - len(A), 1):
+                self._cap_candidates(B, limit - len(A))
+                B_set = {path_tuple for _, path_tuple in B}
 
             # Si no hay más candidatos, terminar
             if not B:
-                break
+                return
 
             # Seleccionar el mejor candidato
             best_cost, best_path_tuple = heapq.heappop(B)
@@ -177,56 +791,940 @@ class KShortestPaths:
             B_set.discard(best_path_tuple)
 
             A.append((best_path, best_cost))
+            A_set.add(best_path_tuple)
+            if max_cost is None or best_cost <= max_cost:
+                yield best_path, best_cost
+
+    def reverse_shortest_path_tree(self, dest: int) -> Tuple[List[float], List[int]]:
+        """
+        Calcula el árbol de caminos más cortos de todos los nodos hacia dest,
+        ejecutando Dijkstra sobre las aristas invertidas.
+
+        Args:
+            dest: Nodo destino (raíz del árbol)
+
+        Returns:
+            Tupla (distancias, siguiente): distancia de cada nodo a dest y
+            siguiente nodo en su camino más corto (-1 si no hay camino)
+        """
+        distances = [np.inf] * self.num_nodes
+        next_hop = [-1] * self.num_nodes
+        distances[dest] = 0
+
+        pq = [(0, dest)]
+        while pq:
+            current_dist, v = heapq.heappop(pq)
+            if current_dist > distances[v]:
+                continue
+
+            for u, weight in self.graph.get_predecessors(v):
+                new_dist = current_dist + weight
+                if new_dist < distances[u]:
+                    distances[u] = new_dist
+                    next_hop[u] = v
+                    heapq.heappush(pq, (new_dist, u))
+
+        return distances, next_hop
+
+    def _iter_yen_spt(self, source: int, dest: int,
+                      tree: Optional[Tuple[List[float], List[int]]] = None,
+                      limit: Optional[int] = None, max_cost: Optional[float] = None,
+                      max_hops: Optional[int] = None):
+        """
+        Genera caminos sin ciclos en orden de costo usando Yen con
+        reutilización del árbol inverso hacia dest.
+
+        Cada camino guarda su índice de desviación; los caminos posteriores
+        solo se desvían desde ese índice en adelante (Lawler), ya que los
+        prefijos anteriores fueron explorados al generar su camino padre.
+
+        Con max_cost se omiten las desviaciones cuya cota (costo de la raíz
+        más la distancia del árbol desde el nodo de desviación) lo supera.
+        Con max_hops las búsquedas de desviación se restringen a caminos con
+        las aristas restantes (ver _hop_limited_search), de modo que la
+        enumeración recorre solo caminos válidos.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            tree: Árbol inverso precalculado (ver reverse_shortest_path_tree)
+            limit: Cantidad máxima de caminos a emitir (acota B)
+            max_cost: Costo máximo de los caminos emitidos
+            max_hops: Cantidad máxima de aristas por camino
+
+        Yields:
+            Tuplas (camino, costo) ordenadas por costo
+        """
+        if tree is None:
+            tree = self.reverse_shortest_path_tree(dest)
+        distances, next_hop = tree
+
+        if distances[source] == np.inf:
+            return
+        if max_cost is not None and distances[source] > max_cost:
+            return
+
+        hop_distances = None
+        if max_hops is None:
+            first_path = self._tree_path(source, next_hop)
+        else:
+            hop_distances = self._hop_distances(dest)
+            first_path = self._hop_limited_search(source, dest, set(), set(), tree,
+                                                  max_hops, hop_distances)
+            if first_path is None:
+                return
+
+        first_cost = self._path_cost(first_path)
+        if max_cost is not None and first_cost > max_cost:
+            return
+        yield first_path, first_cost
+
+        A = [first_path]
+        deviations = [0]
+        B = []
+        seen = {tuple(first_path)}
+
+        while limit is None or len(A) < limit:
+            prev_path = A[-1]
+            root_cost = self._path_cost(prev_path[:deviations[-1] + 1])
+
+            for i in range(deviations[-1], len(prev_path) - 1):
+                spur_node = prev_path[i]
+                root_path = prev_path[:i + 1]
+                if i > deviations[-1]:
+                    root_cost += self.graph.get_weight(prev_path[i - 1], spur_node)
+
+                if max_cost is not None and root_cost + distances[spur_node] > max_cost:
+                    continue
+
+                # Siguientes nodos ya usados por caminos de A con la misma raíz
+                excluded_next = {path[i + 1] for path in A
+                                 if len(path) > i + 1 and path[:i + 1] == root_path}
+
+                if max_hops is None:
+                    spur_path = self._spur_search(spur_node, dest, excluded_next,
+                                                  set(root_path[:-1]), tree)
+                else:
+                    spur_path = self._hop_limited_search(spur_node, dest, excluded_next,
+                                                         set(root_path[:-1]), tree,
+                                                         max_hops - i, hop_distances)
+                if spur_path is None:
+                    continue
+
+                total_path = root_path[:-1] + spur_path
+                path_tuple = tuple(total_path)
+                if path_tuple not in seen:
+                    seen.add(path_tuple)
+                    total_cost = self._path_cost(total_path)
+                    if max_cost is None or total_cost <= max_cost:
+                        heapq.heappush(B, (total_cost, path_tuple, i))
 
-        return A
+            if limit is not None:
+                self._cap_candidates(B, limit - len(A))
 
-    def generate_k_paths_matrix(self, k: int = 2) -> Dict[str, np.ndarray]:
+            if not B:
+                return
+
+            best_cost, best_path_tuple, deviation = heapq.heappop(B)
+            best_path = list(best_path_tuple)
+            A.append(best_path)
+            deviations.append(deviation)
+            yield best_path, best_cost
+
+    def _spur_search(self, spur_node: int, dest: int, excluded_next: set, blocked: set,
+                     tree: Tuple[List[float], List[int]]) -> Optional[List[int]]:
+        """
+        Busca el camino más corto desde spur_node hasta dest sin
+        usar las aristas (spur_node, v) con v en excluded_next ni pasar por
+        los nodos bloqueados.
+
+        Primero intenta terminar de inmediato: si el vecino con menor cota
+        peso + distancia del árbol tiene su camino del árbol libre de nodos
+        bloqueados, ese camino es óptimo. Si no, ejecuta A* usando las
+        distancias del árbol como heurística consistente.
+
+        Args:
+            spur_node: Nodo de desviación
+            dest: Nodo destino (raíz del árbol)
+            excluded_next: Vecinos de spur_node cuyas aristas están excluidas
+            blocked: Nodos que el camino no puede visitar
+            tree: Árbol inverso hacia dest
+
+        Returns:
+            Camino desde spur_node hasta dest, o None si no existe
+        """
+        distances, next_hop = tree
+
+        best_bound = np.inf
+        best_neighbors = []
+        for v, weight in self.graph.get_neighbors(spur_node):
+            if v in excluded_next or v in blocked:
+                continue
+            bound = weight + distances[v]
+            if bound < best_bound:
+                best_bound = bound
+                best_neighbors = [v]
+            elif bound == best_bound:
+                best_neighbors.append(v)
+
+        if best_bound == np.inf:
+            return None
+
+        for v in best_neighbors:
+            tail = self._tree_path(v, next_hop)
+            if spur_node not in tail and blocked.isdisjoint(tail):
+                return [spur_node] + tail
+
+        # A* sobre el grafo restringido
+        g_score = {spur_node: 0}
+        previous = {spur_node: -1}
+        closed = set()
+        pq = [(distances[spur_node], spur_node)]
+
+        while pq:
+            _, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+
+            if u == dest:
+                path = []
+                while u != -1:
+                    path.append(u)
+                    u = previous[u]
+                path.reverse()
+                return path
+
+            for v, weight in self.graph.get_neighbors(u):
+                if v in blocked or distances[v] == np.inf:
+                    continue
+                if u == spur_node and v in excluded_next:
+                    continue
+
+                new_g = g_score[u] + weight
+                if new_g < g_score.get(v, np.inf):
+                    g_score[v] = new_g
+                    previous[v] = u
+                    heapq.heappush(pq, (new_g + distances[v], v))
+
+        return None
+
+    def _hop_distances(self, dest: int) -> List[float]:
+        """
+        Calcula con BFS inverso la menor cantidad de aristas desde cada
+        nodo hasta dest.
+
+        Args:
+            dest: Nodo destino
+
+        Returns:
+            Lista con la cantidad de aristas (inf si dest no es alcanzable)
+        """
+        hops = [np.inf] * self.num_nodes
+        hops[dest] = 0
+        frontier = [dest]
+        while frontier:
+            next_frontier = []
+            for v in frontier:
+                for u, _ in self.graph.get_predecessors(v):
+                    if hops[u] == np.inf:
+                        hops[u] = hops[v] + 1
+                        next_frontier.append(u)
+            frontier = next_frontier
+        return hops
+
+    def _hop_limited_search(self, spur_node: int, dest: int, excluded_next: set,
+                            blocked: set, tree: Tuple[List[float], List[int]],
+                            max_hops: int, hop_distances: List[float]) -> Optional[List[int]]:
+        """
+        Busca el camino más corto desde spur_node hasta dest con a lo sumo
+        max_hops aristas, con las mismas restricciones que _spur_search.
+
+        Es un A* sobre estados (nodo, aristas usadas) con las distancias del
+        árbol como heurística; los estados que no pueden llegar a dest con
+        las aristas restantes se podan con hop_distances. Con pesos
+        positivos el óptimo no repite nodos.
+
+        Args:
+            spur_node: Nodo de desviación
+            dest: Nodo destino (raíz del árbol)
+            excluded_next: Vecinos de spur_node cuyas aristas están excluidas
+            blocked: Nodos que el camino no puede visitar
+            tree: Árbol inverso hacia dest
+            max_hops: Cantidad máxima de aristas del camino
+            hop_distances: Aristas mínimas de cada nodo hasta dest
+
+        Returns:
+            Camino desde spur_node hasta dest, o None si no existe
+        """
+        distances, _ = tree
+        if max_hops < hop_distances[spur_node]:
+            return None
+
+        g_score = {(spur_node, 0): 0}
+        previous = {(spur_node, 0): None}
+        # Menor cantidad de aristas con que se asentó cada nodo; un estado
+        # con más aristas y costo no menor está dominado
+        settled_hops = {}
+        pq = [(distances[spur_node], 0, spur_node)]
+
+        while pq:
+            _, hops, u = heapq.heappop(pq)
+            if settled_hops.get(u, max_hops + 1) <= hops:
+                continue
+            settled_hops[u] = hops
+
+            if u == dest:
+                path = []
+                state = (u, hops)
+                while state is not None:
+                    path.append(state[0])
+                    state = previous[state]
+                path.reverse()
+                return path
+
+            for v, weight in self.graph.get_neighbors(u):
+                if v in blocked or distances[v] == np.inf:
+                    continue
+                if hops + 1 + hop_distances[v] > max_hops:
+                    continue
+                if u == spur_node and v in excluded_next:
+                    continue
+
+                new_g = g_score[(u, hops)] + weight
+                state = (v, hops + 1)
+                if new_g < g_score.get(state, np.inf):
+                    g_score[state] = new_g
+                    previous[state] = (u, hops)
+                    heapq.heappush(pq, (new_g + distances[v], hops + 1, v))
+
+        return None
+
+    def _iter_eppstein(self, source: int, dest: int,
+                       tree: Optional[Tuple[List[float], List[int]]] = None,
+                       limit: Optional[int] = None, max_cost: Optional[float] = None):
+        """
+        Genera los recorridos más cortos en orden de costo con el algoritmo
+        de Eppstein.
+
+        Cada arista (u, v) fuera del árbol inverso es una desviación con
+        costo adicional peso + d(v) - d(u). H(v) es un montículo persistente
+        con las desviaciones de todos los nodos en el camino del árbol desde
+        v, y cada recorrido corresponde a una secuencia de desviaciones. Los
+        sucesores de un recorrido se obtienen reemplazando su última
+        desviación por un hijo en el montículo o agregando la raíz de H del
+        extremo de esa desviación, por lo que cada recorrido cuesta O(log k).
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            tree: Árbol inverso precalculado (ver reverse_shortest_path_tree)
+            limit: Cantidad máxima de recorridos a emitir (acota la cola)
+            max_cost: Costo máximo de los recorridos emitidos
+
+        Yields:
+            Tuplas (camino, costo) ordenadas por costo
+        """
+        if tree is None:
+            tree = self.reverse_shortest_path_tree(dest)
+        distances, next_hop = tree
+
+        if distances[source] == np.inf:
+            return
+        if max_cost is not None and distances[source] > max_cost:
+            return
+
+        # Construir H(v) en orden creciente de distancia: el siguiente nodo
+        # del árbol siempre se procesa antes
+        heaps = [None] * self.num_nodes
+        reachable = [v for v in range(self.num_nodes) if distances[v] != np.inf]
+        reachable.sort(key=distances.__getitem__)
+
+        for u in reachable:
+            heap = heaps[next_hop[u]] if next_hop[u] != -1 else None
+            for v, weight in self.graph.get_neighbors(u):
+                if v == next_hop[u] or distances[v] == np.inf:
+                    continue
+                sidetrack = weight + distances[v] - distances[u]
+                heap = _leftist_merge(heap, (sidetrack, 1, None, None, u, v))
+            heaps[u] = heap
+
+        yield self._walk_from_sidetracks(source, None, next_hop)
+        emitted = 1
+
+        # Los sucesores nunca cuestan menos que su recorrido padre, así que
+        # las entradas sobre max_cost se descartan sin perder resultados
+        def push(cost, node, sidetracks):
+            nonlocal counter
+            if max_cost is None or cost <= max_cost:
+                counter += 1
+                heapq.heappush(pq, (cost, counter, node, sidetracks))
+
+        # Cola: (costo, contador, nodo del montículo, desviaciones); las
+        # desviaciones son una lista enlazada (arista, anteriores)
+        counter = 0
+        pq = []
+        root = heaps[source]
+        if root is not None:
+            push(distances[source] + root[0], root, ((root[4], root[5]), None))
+
+        while pq and (limit is None or emitted < limit):
+            cost, _, node, sidetracks = heapq.heappop(pq)
+            yield self._walk_from_sidetracks(source, sidetracks, next_hop)
+            emitted += 1
+
+            key, _, left, right, _, v = node
+            for child in (left, right):
+                if child is not None:
+                    push(cost - key + child[0], child, ((child[4], child[5]), sidetracks[1]))
+
+            extension = heaps[v]
+            if extension is not None:
+                push(cost + extension[0], extension, ((extension[4], extension[5]), sidetracks))
+
+            if limit is not None:
+                self._cap_candidates(pq, limit - emitted)
+
+    def _walk_from_sidetracks(self, source: int, sidetracks: Optional[tuple],
+                              next_hop: List[int]) -> Tuple[List[int], float]:
+        """
+        Reconstruye un recorrido a partir de su secuencia de desviaciones.
+
+        Args:
+            source: Nodo origen
+            sidetracks: Lista enlazada ((u, v), anteriores) con la última
+                desviación primero, o None para el camino del árbol
+            next_hop: Siguiente nodo de cada nodo en el árbol inverso
+
+        Returns:
+            Tupla (camino, costo)
+        """
+        edges = []
+        while sidetracks is not None:
+            edges.append(sidetracks[0])
+            sidetracks = sidetracks[1]
+        edges.reverse()
+
+        path = [source]
+        for u, v in edges:
+            while path[-1] != u:
+                path.append(next_hop[path[-1]])
+            path.append(v)
+        while next_hop[path[-1]] != -1:
+            path.append(next_hop[path[-1]])
+
+        return path, self._path_cost(path)
+
+    @staticmethod
+    def _tree_path(node: int, next_hop: List[int]) -> List[int]:
+        """
+        Reconstruye el camino desde node hasta la raíz de un árbol inverso.
+
+        Args:
+            node: Nodo inicial
+            next_hop: Siguiente nodo de cada nodo en el árbol
+
+        Returns:
+            Lista de nodos desde node hasta la raíz
+        """
+        path = [node]
+        while next_hop[node] != -1:
+            node = next_hop[node]
+            path.append(node)
+        return path
+
+    def _path_cost(self, path: List[int]) -> float:
+        """
+        Calcula el costo total de un camino.
+
+        Args:
+            path: Lista de nodos
+
+        Returns:
+            Suma de los pesos de las aristas del camino
+        """
+        total_cost = 0
+        for j in range(len(path) - 1):
+            total_cost += self.graph.get_weight(path[j], path[j + 1])
+        return total_cost
+
+    def generate_k_paths_matrix(self, k: int = 2, per_destination: bool = False,
+                                workers: Optional[int] = None, vectorized: bool = False,
+                                block_size: Optional[int] = None,
+                                dtype=np.float64, store_paths: bool = False) -> Dict[str, np.ndarray]:
         """
         Genera matrices de k-paths para todos los pares de nodos.
 
+        Los costos se guardan en un único arreglo contiguo (k, N, N); las
+        matrices 'path_r' son vistas de sus rangos, sin copias. Los pares
+        sin camino se detectan antes con Graph.reachability_matrix (componentes
+        fuertemente conexas) y quedan en inf sin ninguna búsqueda.
+
         Args:
-            k: Número de caminos más cortos (2 o 3)
+            k: Número de caminos más cortos (cualquier k >= 1)
+            per_destination: Si True, calcula un único árbol inverso por
+                destino y deriva de él el primer camino de cada origen y las
+                desviaciones siguientes (N Dijkstra más desviaciones en lugar
+                de N² ejecuciones de Yen). Usa el motor 'eppstein' si está
+                seleccionado y 'yen_spt' en otro caso.
+            workers: Número de procesos. Si es mayor que 1, reparte las filas
+                (o los destinos, con per_destination) entre un pool de
+                procesos que comparten el grafo y las matrices de salida en
+                memoria compartida. El resultado es idéntico al serial.
+            vectorized: Si True, llena 'path_1' con Floyd–Warshall vectorizado
+                (ver floyd_warshall) y solo ejecuta Yen para los caminos
+                siguientes de los pares alcanzables. Conviene en grafos densos.
+            block_size: Filas por bloque de Floyd–Warshall (acota la memoria
+                temporal); None procesa la matriz completa en cada paso
+            dtype: Tipo de los costos; np.float32 reduce la memoria a la mitad
+            store_paths: Si True, conserva también la secuencia de nodos de
+                cada camino en arreglos planos (ver stored_paths)
 
         Returns:
             Diccionario con matrices:
-            - 'path_1': Matriz con costos del camino más corto
-            - 'path_2': Matriz con costos del segundo camino más corto
-            - 'path_3': Matriz con costos del tercer camino más corto (si k=3)
+            - 'paths': Arreglo (k, N, N); paths[r] tiene los costos del
+              camino r+1 de cada par
+            - 'path_1' ... 'path_k': Vistas de cada rango de 'paths'
             - 'adjacency': Matriz de adyacencia original
+            - Con store_paths: 'path_nodes' (nodos de todos los caminos
+              concatenados), 'path_offsets' y 'path_lengths' (arreglos
+              (k, N, N) con el inicio y el largo de cada camino en
+              'path_nodes'; largo 0 indica que no existe)
         """
-        matrices = {
-            'adjacency': self.graph.get_adjacency_matrix(),
-            'path_1': np.full((self.num_nodes, self.num_nodes), np.inf),
-            'path_2': np.full((self.num_nodes, self.num_nodes), np.inf)
-        }
-
-        if k >= 3:
-            matrices['path_3'] = np.full((self.num_nodes, self.num_nodes), np.inf)
-
-        # Calcular k-paths para cada par de nodos
-        for i in range(self.num_nodes):
-            for j in range(self.num_nodes):
-                if i == j:
-                    matrices['path_1'][i][j] = 0
-                    matrices['path_2'][i][j] = 0
-                    if k >= 3:
-                        matrices['path_3'][i][j] = 0
-                    continue
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
 
-                paths = self.find_k_shortest_paths(i, j, k)
+        costs = np.full((k, self.num_nodes, self.num_nodes), np.inf, dtype=dtype)
 
-                # Llenar las matrices según los caminos encontrados
-                for idx, (path, cost) in enumerate(paths):
-                    if idx == 0:
-                        matrices['path_1'][i][j] = cost
-                    elif idx == 1:
-                        matrices['path_2'][i][j] = cost
-                    elif idx == 2 and k >= 3:
-                        matrices['path_3'][i][j] = cost
+        # Todos los caminos de un nodo a sí mismo tienen costo 0
+        for matrix in costs:
+            np.fill_diagonal(matrix, 0)
+
+        first_rank = 0
+        if vectorized:
+            costs[0] = self.floyd_warshall(self.graph.get_adjacency_matrix(), block_size)
+            mask = costs[0] != np.inf
+            first_rank = 1
+        else:
+            # Los pares sin camino (según las componentes fuertemente
+            # conexas) quedan en inf sin ejecutar ninguna búsqueda
+            mask = self.graph.reachability_matrix()
+
+        parts = []
+        if first_rank < k or store_paths:
+            if workers is not None and workers > 1:
+                parts = self._fill_path_costs_parallel(costs, k, per_destination, workers,
+                                                       mask, first_rank, store_paths)
+            elif store_paths:
+                parts = self._fill_path_records(costs, range(self.num_nodes), k,
+                                                per_destination, mask, first_rank)
+            else:
+                self._fill_path_costs(costs, range(self.num_nodes), k, per_destination,
+                                      mask, first_rank)
+
+        matrices = {'adjacency': self.graph.get_adjacency_matrix(), 'paths': costs}
+        for idx, matrix in enumerate(costs):
+            matrices[f'path_{idx + 1}'] = matrix
+
+        if store_paths:
+            matrices['path_nodes'] = np.empty(0, dtype=np.int32)
+            matrices['path_offsets'] = np.zeros(costs.shape, dtype=np.int64)
+            matrices['path_lengths'] = np.zeros(costs.shape, dtype=np.int32)
+            # El único camino de un nodo a sí mismo es [nodo]
+            records = [(0, i, i, [i]) for i in range(self.num_nodes)]
+            _append_path_records(matrices, parts + [_pack_path_records(records)])
 
         return matrices
 
-    def get_path_details(self, source: int, dest: int, k: int = 2) -> List[Dict]:
+    def stored_paths(self, matrices: Dict[str, np.ndarray], source: int,
+                     dest: int) -> List[Tuple[List[int], float]]:
+        """
+        Reconstruye los caminos de un par guardados por
+        generate_k_paths_matrix(store_paths=True), sin recalcularlos.
+
+        Args:
+            matrices: Diccionario con los arreglos de caminos
+            source: Nodo origen
+            dest: Nodo destino
+
+        Returns:
+            Lista de tuplas (camino, costo) ordenadas por rango
+        """
+        nodes = matrices['path_nodes']
+        paths = []
+        for rank in range(len(matrices['paths'])):
+            length = matrices['path_lengths'][rank, source, dest]
+            if length == 0:
+                break
+            start = matrices['path_offsets'][rank, source, dest]
+            paths.append((nodes[start:start + length].tolist(),
+                          matrices['paths'][rank, source, dest].item()))
+        return paths
+
+    def update_k_paths_matrix(self, matrices: Dict[str, np.ndarray],
+                              changes: List[Tuple[int, int, float]],
+                              per_destination: bool = False) -> np.ndarray:
+        """
+        Aplica un lote de cambios de aristas al grafo y actualiza las
+        matrices de generate_k_paths_matrix recalculando solo los pares que
+        pueden verse afectados.
+
+        Sea D la matriz de distancias del grafo donde cada arista cambiada
+        toma el menor de sus pesos anterior y nuevo. Todo camino que use la
+        arista (u, v), antes o después del cambio, cuesta al menos
+        D[i][u] + w + D[v][j]. Si esa cota supera el costo del último camino
+        guardado de (i, j) para todas las aristas cambiadas, los caminos
+        guardados no usan ninguna de ellas y ningún camino nuevo los mejora,
+        por lo que el par no cambia. Los pares sin ningún camino por las
+        aristas cambiadas (cota infinita) tampoco se recalculan. Si algún
+        cambio es inválido no se aplica ninguno.
+
+        La garantía supone un motor exacto, por lo que se requiere el
+        algoritmo 'yen_spt' o 'eppstein': los caminos de Yen clásico
+        dependen de las desviaciones previas y no se pueden actualizar por
+        pares.
+
+        Args:
+            matrices: Diccionario retornado por generate_k_paths_matrix; se
+                actualiza en su lugar
+            changes: Lista de tuplas (origen, destino, peso); un peso
+                infinito elimina la arista
+            per_destination: Modo de cálculo de los pares afectados (ver
+                generate_k_paths_matrix)
+
+        Returns:
+            Matriz booleana N×N con los pares recalculados
+        """
+        if self.algorithm == 'yen':
+            raise ValueError("update_k_paths_matrix requiere el algoritmo 'yen_spt' o 'eppstein'")
+
+        # Validar todo el lote antes de modificar el grafo, para no dejar
+        # cambios aplicados a medias si uno es inválido
+        for source, dest, weight in changes:
+            if not (0 <= source < self.num_nodes and 0 <= dest < self.num_nodes) or source == dest:
+                raise ValueError(f"Arista inválida: ({source}, {dest})")
+            if weight <= 0:
+                raise ValueError("Los pesos deben ser positivos")
+
+        changed = {}
+        for source, dest, weight in changes:
+            # Conservar el peso previo al primer cambio de cada arista
+            old_weight = changed.get((source, dest), (self.graph.get_weight(source, dest),))[0]
+            if weight == np.inf:
+                self.graph.remove_edge(source, dest)
+            else:
+                self.graph.add_edge(source, dest, weight)
+            changed[(source, dest)] = (old_weight, self.graph.get_weight(source, dest))
+
+        adjacency = self.graph.get_adjacency_matrix()
+        matrices['adjacency'] = adjacency
+
+        lower = adjacency.copy()
+        edges = []
+        for (source, dest), (old_weight, new_weight) in changed.items():
+            if old_weight == new_weight:
+                continue
+            lower[source][dest] = min(old_weight, new_weight)
+            edges.append((source, dest, lower[source][dest]))
+
+        costs = matrices['paths']
+        # La cota suma los pesos en otro orden que el costo guardado, que
+        # además puede estar redondeado a dtype: se compara con tolerancia
+        # relativa sobre el último costo en float64
+        last = costs[-1].astype(np.float64)
+        threshold = last + np.abs(last) * (np.finfo(costs.dtype).eps * self.num_nodes)
+        affected = np.zeros((self.num_nodes, self.num_nodes), dtype=bool)
+        if edges:
+            dist = self.floyd_warshall(lower)
+            for source, dest, weight in edges:
+                bound = np.add.outer(dist[:, source], dist[dest, :]) + weight
+                affected |= np.isfinite(bound) & (bound <= threshold)
+            np.fill_diagonal(affected, False)
+
+        if affected.any():
+            costs[:, affected] = np.inf
+            # Los pares que dejaron de ser alcanzables quedan en inf sin
+            # ejecutar ninguna búsqueda (ver generate_k_paths_matrix)
+            mask = affected & self.graph.reachability_matrix()
+            if 'path_nodes' in matrices:
+                parts = self._fill_path_records(costs, range(self.num_nodes), len(costs),
+                                                per_destination, mask)
+                # Los nodos anteriores quedan sin referencias en 'path_nodes';
+                # se compacta cuando superan a los que siguen en uso
+                matrices['path_lengths'][:, affected] = 0
+                if parts:
+                    _append_path_records(matrices, parts)
+                live = int(matrices['path_lengths'].sum(dtype=np.int64))
+                if len(matrices['path_nodes']) - live > live:
+                    _compact_path_records(matrices)
+            else:
+                self._fill_path_costs(costs, range(self.num_nodes), len(costs), per_destination,
+                                      mask)
+
+        return affected
+
+    def _fill_path_costs(self, costs: np.ndarray, indices, k: int, per_destination: bool,
+                         mask: Optional[np.ndarray] = None, first_rank: int = 0,
+                         records: Optional[list] = None) -> None:
+        """
+        Calcula los costos de los k-paths de un subconjunto de pares.
+
+        Args:
+            costs: Arreglo (matrices, N, N) a llenar; costs[r][i][j] es el
+                costo del camino r+1 de i a j
+            indices: Nodos origen a procesar (destinos si per_destination)
+            k: Número de caminos a calcular por par
+            per_destination: Si True, reutiliza un árbol inverso por destino
+            mask: Matriz booleana opcional; los pares en False se omiten
+            first_rank: Primer rango a escribir (los anteriores ya están
+                calculados en costs)
+            records: Lista opcional donde agregar (rango, origen, destino,
+                camino) de cada camino obtenido
+        """
+        for a in indices:
+            if per_destination:
+                pairs = [(i, a) for i in range(self.num_nodes) if i != a]
+            else:
+                pairs = [(a, j) for j in range(self.num_nodes) if j != a]
+
+            if mask is not None:
+                pairs = [(i, j) for i, j in pairs if mask[i][j]]
+            if not pairs:
+                continue
+
+            if per_destination:
+                tree = self.reverse_shortest_path_tree(a)
+
+            # Con 'yen' el árbol usa el motor 'yen_spt', cuyos caminos no
+            # deben mezclarse en la caché con los de Yen clásico
+            use_cache = not per_destination or self.algorithm != 'yen'
+
+            for i, j in pairs:
+                if per_destination:
+                    paths = self._cached_paths(i, j, k) if use_cache else None
+                    if paths is None:
+                        paths = list(islice(self._iter_from_tree(i, j, tree, k), k))
+                        if use_cache:
+                            self._store_paths(i, j, k, paths)
+                else:
+                    paths = self.find_k_shortest_paths(i, j, k)
+
+                for idx, (path, cost) in enumerate(paths):
+                    if idx >= len(costs):
+                        break
+                    if idx >= first_rank:
+                        costs[idx][i][j] = cost
+                    if records is not None:
+                        records.append((idx, i, j, path))
+
+    def _fill_path_records(self, costs: np.ndarray, indices, k: int, per_destination: bool,
+                           mask: Optional[np.ndarray] = None, first_rank: int = 0) -> list:
+        """
+        Ejecuta _fill_path_costs índice por índice y empaqueta los caminos
+        de cada uno en arreglos, para no acumular N²·K listas de Python.
+
+        Args:
+            costs: Arreglo (matrices, N, N) a llenar
+            indices: Nodos origen a procesar (destinos si per_destination)
+            k: Número de caminos a calcular por par
+            per_destination: Si True, reutiliza un árbol inverso por destino
+            mask: Matriz booleana opcional de pares a calcular
+            first_rank: Primer rango a escribir
+
+        Returns:
+            Caminos empaquetados de cada índice con resultados (ver
+            _pack_path_records)
+        """
+        parts = []
+        for a in indices:
+            records = []
+            self._fill_path_costs(costs, (a,), k, per_destination, mask, first_rank, records)
+            if records:
+                parts.append(_pack_path_records(records))
+        return parts
+
+    def _fill_path_costs_parallel(self, costs: np.ndarray, k: int, per_destination: bool,
+                                  workers: int, mask: Optional[np.ndarray] = None,
+                                  first_rank: int = 0, store_paths: bool = False) -> list:
+        """
+        Reparte el cálculo de _fill_path_costs entre un pool de procesos.
+
+        El grafo y el arreglo de salida se colocan en memoria compartida una
+        sola vez; cada tarea solo recibe la lista de índices a procesar.
+
+        Args:
+            costs: Arreglo (matrices, N, N) a llenar
+            k: Número de caminos a calcular por par
+            per_destination: Si True, reparte destinos en lugar de orígenes
+            workers: Número de procesos
+            mask: Matriz booleana opcional de pares a calcular
+            first_rank: Primer rango a escribir
+            store_paths: Si True, cada proceso retorna los caminos obtenidos
+
+        Returns:
+            Caminos empaquetados por cada tarea (ver _pack_path_records);
+            vacío si store_paths es False
+        """
+        blocks = []
+        try:
+            graph_specs = self._share_graph(blocks)
+
+            output_shm, output_spec = _share_array(costs)
+            blocks.append(output_shm)
+
+            mask_spec = None
+            if mask is not None:
+                mask_shm, mask_spec = _share_array(mask)
+                blocks.append(mask_shm)
+
+            # Índices intercalados para equilibrar la carga entre procesos
+            num_chunks = min(self.num_nodes, workers * 4)
+            chunks = [list(range(c, self.num_nodes, num_chunks)) for c in range(num_chunks)]
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_matrix_worker,
+                                     initargs=(self.num_nodes, graph_specs, output_spec,
+                                               self.algorithm, self.search, k, per_destination,
+                                               mask_spec, first_rank, store_paths)) as pool:
+                parts = [part for part in pool.map(_compute_matrix_chunk, chunks)
+                         if part is not None]
+
+            costs[...] = np.ndarray(costs.shape, dtype=costs.dtype, buffer=output_shm.buf)
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        return parts
+
+    def _query_groups_parallel(self, groups, k: int,
+                               workers: int) -> List[Tuple[int, int, list]]:
+        """
+        Reparte el cálculo de _query_groups entre un pool de procesos que
+        comparten el grafo en memoria compartida.
+
+        Args:
+            groups: Lista de tuplas (destino, orígenes)
+            k: Número de caminos por par
+            workers: Número de procesos
+
+        Returns:
+            Lista de tuplas (origen, destino, caminos)
+        """
+        blocks = []
+        try:
+            graph_specs = self._share_graph(blocks)
+
+            # Grupos intercalados para equilibrar la carga entre procesos
+            num_chunks = min(len(groups), workers * 4)
+            chunks = [groups[c::num_chunks] for c in range(num_chunks)]
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                     initargs=(self.num_nodes, graph_specs, self.algorithm,
+                                               self.search, k)) as pool:
+                computed = [item for part in pool.map(_compute_batch_chunk, chunks)
+                            for item in part]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        return computed
+
+    def _share_graph(self, blocks: list) -> tuple:
+        """
+        Copia los arreglos del grafo a memoria compartida, incluidas las
+        tablas de landmarks si existen (las búsquedas de los procesos deben
+        desempatar igual que las del proceso principal).
+
+        Args:
+            blocks: Lista donde se agregan los bloques creados, que el
+                llamador debe cerrar y liberar
+
+        Returns:
+            Tupla (descriptores del grafo, descriptores de landmarks o None)
+            para _attach_graph
+        """
+        if self.graph.sparse:
+            self.graph.compact()
+            graph_arrays = [self.graph.csr_offsets, self.graph.csr_targets,
+                            self.graph.csr_weights]
+        else:
+            graph_arrays = [self.graph.adjacency_matrix]
+
+        landmark_arrays = None
+        if self.graph.landmarks is not None:
+            landmark_arrays = [self.graph.landmarks, self.graph.landmark_from,
+                               self.graph.landmark_to]
+
+        specs = []
+        for arrays in (graph_arrays, landmark_arrays):
+            if arrays is None:
+                specs.append(None)
+                continue
+            array_specs = []
+            for array in arrays:
+                shm, spec = _share_array(array)
+                blocks.append(shm)
+                array_specs.append(spec)
+            specs.append(array_specs)
+        return tuple(specs)
+
+    def _iter_from_tree(self, source: int, dest: int,
+                        tree: Tuple[List[float], List[int]], limit: Optional[int] = None):
+        """
+        Genera caminos en orden de costo reutilizando un árbol inverso ya
+        calculado hacia dest.
+
+        Args:
+            source: Nodo origen
+            dest: Nodo destino
+            tree: Árbol inverso hacia dest
+            limit: Cantidad máxima de caminos a emitir
+
+        Yields:
+            Tuplas (camino, costo) ordenadas por costo
+        """
+        if self.algorithm == 'eppstein':
+            yield from self._iter_eppstein(source, dest, tree, limit)
+        else:
+            yield from self._iter_yen_spt(source, dest, tree, limit)
+
+    @staticmethod
+    def floyd_warshall(matrix: np.ndarray, block_size: Optional[int] = None) -> np.ndarray:
+        """
+        Calcula las distancias más cortas entre todos los pares con
+        Floyd–Warshall vectorizado: cada nodo intermedio k se aplica a toda
+        la matriz con una sola operación de broadcasting
+        D = min(D, D[:, k] + D[k, :]).
+
+        La actualización es segura en el lugar porque la fila y la columna k
+        no cambian en el paso k (la diagonal es 0).
+
+        Args:
+            matrix: Matriz de adyacencia (infinito donde no hay arista)
+            block_size: Filas procesadas por operación; limita la memoria
+                temporal a block_size×N. None procesa todas las filas juntas.
+
+        Returns:
+            Matriz N×N de distancias más cortas
+        """
+        dist = np.array(matrix, dtype=np.float64)
+        n = len(dist)
+        np.fill_diagonal(dist, np.minimum(np.diagonal(dist), 0))
+
+        if block_size is None or block_size <= 0:
+            block_size = max(n, 1)
+
+        for k in range(n):
+            row_k = dist[k]
+            for start in range(0, n, block_size):
+                block = dist[start:start + block_size]
+                np.minimum(block, block[:, k, None] + row_k, out=block)
+
+        return dist
+
+    def get_path_details(self, source: int, dest: int, k: int = 2,
+                         matrices: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
         """
         Obtiene detalles completos de los k-paths entre dos nodos.
 
@@ -234,6 +1732,8 @@ class KShortestPaths:
             source: Nodo origen
             dest: Nodo destino
             k: Número de caminos
+            matrices: Resultado de generate_k_paths_matrix; si guarda los
+                caminos (store_paths=True) se reutilizan sin recalcular
 
         Returns:
             Lista de diccionarios con información de cada camino:
@@ -241,7 +1741,10 @@ class KShortestPaths:
             - 'cost': Costo total
             - 'edges': Lista de aristas con pesos
         """
-        paths = self.find_k_shortest_paths(source, dest, k)
+        if matrices is not None and 'path_nodes' in matrices:
+            paths = self.stored_paths(matrices, source, dest)[:k]
+        else:
+            paths = self.find_k_shortest_paths(source, dest, k)
         details = []
 
         for path, cost in paths:
@@ -280,4 +1783,163 @@ class KShortestPaths:
             row_str = " ".join([f"{val:6.1f}" if val != -1 else "   inf" for val in row])
             result += row_str + "\n"
 
-        return result
\ No newline at end of file
+        return result
+
+
+def _share_array(array: np.ndarray):
+    """
+    Copia un arreglo a un bloque nuevo de memoria compartida.
+
+    Args:
+        array: Arreglo a compartir
+
+    Returns:
+        Tupla (bloque, descriptor) donde el descriptor (nombre, forma, dtype)
+        permite a otros procesos abrir el arreglo sin copiarlo
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach_array(spec) -> np.ndarray:
+    """
+    Abre en el proceso trabajador un arreglo creado con _share_array.
+
+    Args:
+        spec: Descriptor (nombre, forma, dtype)
+
+    Returns:
+        Arreglo respaldado por la memoria compartida
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    # Mantener la referencia mientras viva el proceso
+    _worker_state.setdefault('blocks', []).append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _attach_graph(num_nodes: int, graph_specs) -> Graph:
+    """
+    Reconstruye en el proceso trabajador el grafo compartido con
+    KShortestPaths._share_graph (sin copiar la matriz, los arreglos CSR ni
+    las tablas de landmarks).
+    """
+    array_specs, landmark_specs = graph_specs
+    arrays = [_attach_array(spec) for spec in array_specs]
+    if len(arrays) == 1:
+        graph = Graph.from_arrays(num_nodes, adjacency_matrix=arrays[0])
+    else:
+        graph = Graph.from_arrays(num_nodes, csr=tuple(arrays))
+
+    if landmark_specs is not None:
+        graph.landmarks, graph.landmark_from, graph.landmark_to = (
+            _attach_array(spec) for spec in landmark_specs)
+    return graph
+
+
+def _init_matrix_worker(num_nodes: int, graph_specs, output_spec, algorithm: str,
+                        search: str, k: int, per_destination: bool, mask_spec, first_rank: int,
+                        store_paths: bool) -> None:
+    """
+    Inicializa un proceso trabajador de generate_k_paths_matrix sobre el
+    grafo y la salida en memoria compartida.
+    """
+    _worker_state['k_paths'] = KShortestPaths(_attach_graph(num_nodes, graph_specs),
+                                              algorithm, search)
+    _worker_state['output'] = _attach_array(output_spec)
+    _worker_state['mask'] = _attach_array(mask_spec) if mask_spec is not None else None
+    _worker_state['k'] = k
+    _worker_state['per_destination'] = per_destination
+    _worker_state['first_rank'] = first_rank
+    _worker_state['store_paths'] = store_paths
+
+
+def _compute_matrix_chunk(indices: List[int]):
+    """
+    Calcula en el proceso trabajador las filas (o columnas, en modo por
+    destino) indicadas, escribiendo en la salida compartida. Si se
+    guardan los caminos, los retorna empaquetados.
+    """
+    records = [] if _worker_state['store_paths'] else None
+    _worker_state['k_paths']._fill_path_costs(_worker_state['output'], indices,
+                                              _worker_state['k'],
+                                              _worker_state['per_destination'],
+                                              _worker_state['mask'],
+                                              _worker_state['first_rank'],
+                                              records)
+    return _pack_path_records(records) if records is not None else None
+
+
+def _init_batch_worker(num_nodes: int, graph_specs, algorithm: str, search: str,
+                       k: int) -> None:
+    """
+    Inicializa un proceso trabajador de query_batch sobre el grafo en
+    memoria compartida.
+    """
+    _worker_state['k_paths'] = KShortestPaths(_attach_graph(num_nodes, graph_specs),
+                                              algorithm, search)
+    _worker_state['k'] = k
+
+
+def _compute_batch_chunk(groups) -> List[Tuple[int, int, list]]:
+    """
+    Calcula en el proceso trabajador los grupos (destino, orígenes)
+    indicados y retorna sus caminos.
+    """
+    return _worker_state['k_paths']._query_groups(groups, _worker_state['k'])
+
+
+def _pack_path_records(records: list) -> Tuple[np.ndarray, ...]:
+    """
+    Convierte una lista de (rango, origen, destino, camino) en arreglos.
+
+    Args:
+        records: Caminos obtenidos por _fill_path_costs
+
+    Returns:
+        Tupla (rangos, orígenes, destinos, largos, nodos concatenados)
+    """
+    columns = [np.fromiter((record[c] for record in records), dtype=np.int64,
+                           count=len(records)) for c in range(3)]
+    lengths = np.fromiter((len(record[3]) for record in records), dtype=np.int32,
+                          count=len(records))
+    nodes = np.fromiter((v for record in records for v in record[3]), dtype=np.int32,
+                        count=int(lengths.sum()))
+    return (*columns, lengths, nodes)
+
+
+def _append_path_records(matrices: Dict[str, np.ndarray], parts: list) -> None:
+    """
+    Agrega caminos empaquetados a los arreglos de caminos de las matrices,
+    actualizando el inicio y el largo de cada par.
+
+    Args:
+        matrices: Diccionario con 'path_nodes', 'path_offsets' y 'path_lengths'
+        parts: Lista de tuplas retornadas por _pack_path_records
+    """
+    ranks, sources, dests, lengths, nodes = (np.concatenate(column) for column in zip(*parts))
+    starts = len(matrices['path_nodes']) + np.cumsum(lengths) - lengths
+    matrices['path_offsets'][ranks, sources, dests] = starts
+    matrices['path_lengths'][ranks, sources, dests] = lengths
+    matrices['path_nodes'] = np.concatenate([matrices['path_nodes'], nodes])
+
+
+def _compact_path_records(matrices: Dict[str, np.ndarray]) -> None:
+    """
+    Reconstruye 'path_nodes' con solo los caminos referenciados por
+    'path_offsets' y 'path_lengths', en el mismo orden, y actualiza sus
+    inicios.
+
+    Args:
+        matrices: Diccionario con 'path_nodes', 'path_offsets' y 'path_lengths'
+    """
+    live = matrices['path_lengths'] > 0
+    starts = matrices['path_offsets'][live]
+    lengths = matrices['path_lengths'][live].astype(np.int64)
+    new_starts = np.cumsum(lengths) - lengths
+    index = np.repeat(starts - new_starts, lengths) + np.arange(lengths.sum())
+    matrices['path_nodes'] = matrices['path_nodes'][index]
+    matrices['path_offsets'][...] = 0
+    matrices['path_offsets'][live] = new_starts
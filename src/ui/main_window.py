@@ -35,7 +35,7 @@ class CalculationThread(QThread):
             k_paths = KShortestPaths(self.graph)
             self.progress.emit(30)
 
-            matrices = k_paths.generate_k_paths_matrix(k=self.k_value)
+            matrices = k_paths.generate_k_paths_matrix(k=self.k_value, store_paths=True)
             self.progress.emit(70)
 
             result = {
@@ -361,10 +361,10 @@ class MainWindow(QMainWindow):
         # Mostrar detalles de caminos específicos
         source = self.source_combo.currentData()
         dest = self.dest_combo.currentData()
-        self.display_path_details(source, dest)
+        details = self.display_path_details(source, dest)
 
-        # Visualizar caminos en el grafo
-        paths = self.k_paths.find_k_shortest_paths(source, dest, self.current_k)
+        # Visualizar caminos en el grafo (reutiliza los caminos ya calculados)
+        paths = [(detail['path'], detail['cost']) for detail in details]
         self.graph_canvas.highlight_paths(paths)
 
         # Habilitar exportación
@@ -407,32 +407,21 @@ class MainWindow(QMainWindow):
         )
         text += "\n"
 
-        text += KShortestPaths.format_matrix(
-            self.matrices['path_1'],
-            "Matriz del 1er Camino Más Corto (K=1)"
-        )
-        text += "\n"
-
-        text += KShortestPaths.format_matrix(
-            self.matrices['path_2'],
-            "Matriz del 2do Camino Más Corto (K=2)"
-        )
-        text += "\n"
-
-        if 'path_3' in self.matrices:
+        for rank, matrix in enumerate(self.matrices['paths'], 1):
             text += KShortestPaths.format_matrix(
-                self.matrices['path_3'],
-                "Matriz del 3er Camino Más Corto (K=3)"
+                matrix,
+                f"Matriz del {rank}° Camino Más Corto (K={rank})"
             )
+            text += "\n"
 
         self.matrices_text.setText(text)
 
     def display_path_details(self, source, dest):
-        """Muestra los detalles de los caminos entre dos nodos"""
+        """Muestra los detalles de los caminos entre dos nodos y los retorna"""
         if self.k_paths is None:
-            return
+            return []
 
-        details = self.k_paths.get_path_details(source, dest, self.current_k)
+        details = self.k_paths.get_path_details(source, dest, self.current_k, self.matrices)
 
         text = "=" * 80 + "\n"
         text += f"DETALLES DE CAMINOS: Nodo {source} → Nodo {dest}\n"
@@ -453,6 +442,7 @@ class MainWindow(QMainWindow):
                 text += "\n"
 
         self.paths_text.setText(text)
+        return details
 
     def export_results(self):
         """Exporta los resultados a un archivo de texto"""
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graph import Graph
+from k_paths_algorithm import KShortestPaths
+
+
+def test_invalid_change_leaves_graph_and_matrices_untouched():
+    graph = Graph.generate_random_graph(8, 0.4, seed=3)
+    k_paths = KShortestPaths(graph, algorithm='yen_spt')
+    matrices = k_paths.generate_k_paths_matrix(3)
+    weight = graph.get_weight(0, 1)
+
+    with pytest.raises(ValueError):
+        k_paths.update_k_paths_matrix(matrices, [(0, 1, 3.5), (2, 2, 1.0)])
+
+    assert graph.get_weight(0, 1) == weight
+    rebuilt = KShortestPaths(graph, algorithm='yen_spt', cache_size=0).generate_k_paths_matrix(3)
+    assert np.array_equal(matrices['paths'], rebuilt['paths'])
+
+
+def test_classic_yen_is_rejected_before_any_change():
+    graph = Graph.generate_random_graph(8, 0.4, seed=3)
+    k_paths = KShortestPaths(graph)
+    matrices = k_paths.generate_k_paths_matrix(2)
+    weight = graph.get_weight(0, 1)
+
+    with pytest.raises(ValueError):
+        k_paths.update_k_paths_matrix(matrices, [(0, 1, 3.5)])
+
+    assert graph.get_weight(0, 1) == weight